@@ -15,7 +15,12 @@ Setup:
 import rumps
 from curl_cffi import requests  # Chrome TLS fingerprint — bypasses Cloudflare
 from curl_cffi.requests.exceptions import HTTPError as CurlHTTPError
+import atexit
 import json
+import bisect
+import copy
+import functools
+import hashlib
 import math
 import os
 import subprocess
@@ -24,10 +29,15 @@ import sys
 import tempfile
 import time
 import threading
+import types
 import logging
+import logging.handlers
+import queue
+import re
 import urllib.parse
-from dataclasses import dataclass, field
-from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timezone, timedelta
 
 try:
     import browser_cookie3
@@ -35,16 +45,54 @@ try:
 except ImportError:
     _BROWSER_COOKIE3_OK = False
 
+try:
+    import orjson
+    _ORJSON_OK = True
+except ImportError:
+    _ORJSON_OK = False
+
 # ── logging ──────────────────────────────────────────────────────────────────
 
 LOG_FILE = os.path.expanduser("~/.claude_bar.log")
+# Callers only enqueue records; the file write happens on the listener thread
+# so debug logging never blocks the main (UI) thread on disk I/O.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_file_handler = logging.FileHandler(LOG_FILE)
+_log_file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted so the listener thread builds the message.
+
+    The stock prepare() formats on the caller's thread; log arguments must
+    therefore not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
 logging.basicConfig(
-    filename=LOG_FILE,
     level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s %(message)s",
+    format="%(message)s",   # final layout is applied by _log_file_handler
+    handlers=[_DeferredQueueHandler(_log_queue)],
 )
 log = logging.getLogger(__name__)
 
+
+class _LazyJSON:
+    """Log argument that serialises (compactly) on the log listener thread."""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, separators=(",", ":"))
+
 CONFIG_FILE = os.path.expanduser("~/.claude_bar_config.json")
 
 REFRESH_INTERVALS = {
@@ -53,6 +101,8 @@ REFRESH_INTERVALS = {
     "15 min": 900,
 }
 DEFAULT_REFRESH = 300
+_MENU_REBUILD_MIN_GAP = 1.0   # seconds between coalesced menu rebuilds
+_UI_COALESCE_GAP = 0.15       # seconds a posted update settles before it is applied
 
 WARN_THRESHOLD = 80   # notify when any limit crosses this %
 CRIT_THRESHOLD = 95   # title turns red emoji above this %
@@ -62,6 +112,7 @@ WIDGET_CACHE_DIR = os.path.expanduser(
     "~/Library/Application Support/AIQuotaBar"
 )
 WIDGET_CACHE_FILE = os.path.join(WIDGET_CACHE_DIR, "usage.json")
+_WIDGET_HEARTBEAT = 10 * 60   # rewrite an unchanged cache this often (widget stale after 30 min)
 
 # ── notification defaults ─────────────────────────────────────────────────────
 # Keys stored in config under "notifications": { key: bool }
@@ -79,8 +130,10 @@ _NOTIF_DEFAULTS = {
 
 # ── usage history + burn rate ────────────────────────────────────────────────
 
-HISTORY_FILE = os.path.expanduser("~/.claude_bar_history.json")
+# In-memory window for burn rate / sparklines, rebuilt from SQLite on launch
 HISTORY_MAX_AGE = 24 * 3600  # prune entries older than 24 h
+# Pre-SQLite JSON history; migrated into the samples table once, then removed
+_LEGACY_HISTORY_FILE = os.path.expanduser("~/.claude_bar_history.json")
 PACING_ALERT_MINUTES = 30    # alert when ETA drops below this
 
 # ── SQLite long-term history ─────────────────────────────────────────────────
@@ -90,7 +143,9 @@ _DAILY_MAX_DAYS = 90
 _LIMIT_HIT_PCT = 95
 _BURN_WINDOW = 30 * 60       # regression window: 30 minutes
 _MIN_SPAN_SECS = 5 * 60      # need ≥5 min of data before showing ETA
+_BURN_DECAY = math.log(2) / (10 * 60)  # 10-min half-life for burn-rate weights
 _RESET_DROP_PCT = 30          # pct drop that signals a reset
+_SAMPLE_KEEPALIVE = 5 * 60    # re-record an unchanged pct at most this often
 
 _HISTORY_COLORS = {
     "claude": "#D97757", "chatgpt": "#74AA9C",
@@ -98,95 +153,122 @@ _HISTORY_COLORS = {
 }
 
 
+@functools.lru_cache(maxsize=64)
 def _nscolor(hex_str: str, alpha: float = 1.0):
-    """Convert a hex color string like '#D97757' to an NSColor."""
+    """Convert a hex color string like '#D97757' to an NSColor.
+
+    NSColor is immutable, so instances are cached and shared per (hex, alpha).
+    """
     from AppKit import NSColor
     h = hex_str.lstrip("#")
     r, g, b = int(h[0:2], 16) / 255, int(h[2:4], 16) / 255, int(h[4:6], 16) / 255
     return NSColor.colorWithCalibratedRed_green_blue_alpha_(r, g, b, alpha)
 
 
-def _load_history() -> dict:
-    """Load usage history from disk. Returns {"claude": [...], ...}."""
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
+@functools.lru_cache(maxsize=64)
+def _srgb_color(hex_str: str, alpha: float = 1.0):
+    """'#RRGGBB' → shared sRGB NSColor (menu text and icon tints)."""
+    from AppKit import NSColor
+    h = hex_str.lstrip("#")
+    r, g, b = int(h[0:2], 16) / 255, int(h[2:4], 16) / 255, int(h[4:6], 16) / 255
+    return NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, alpha)
 
 
-def _save_history(history: dict):
-    """Persist usage history (atomic write)."""
-    tmp = HISTORY_FILE + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(history, f)
-    os.replace(tmp, HISTORY_FILE)
+@functools.lru_cache(maxsize=64)
+def _cgcolor(hex_str: str, alpha: float = 1.0):
+    """'#RRGGBB' → shared CGColor (history window layers)."""
+    import Quartz
+    h = hex_str.lstrip("#")
+    r, g, b = int(h[0:2], 16) / 255, int(h[2:4], 16) / 255, int(h[4:6], 16) / 255
+    return Quartz.CGColorCreateGenericRGB(r, g, b, alpha)
+
 
+def _burn_update(state: list | None, t: float, pct: int) -> list:
+    """Fold one sample into the running regression sums for a key.
 
-def _append_history(history: dict, key: str, pct: int):
+    state = [last_t, start_t, sw, swt, swp, swtp, swt2], with time measured
+    relative to last_t and weights relative to last_t as well. Moving the
+    anchor to a new sample shifts the time coordinate and decays all
+    weights by the same factor, so each update is O(1).
+    """
+    if state is None or t - state[0] > _BURN_WINDOW:
+        return [t, t, 1.0, 0.0, float(pct), 0.0, 0.0]
+    last_t, start_t, sw, swt, swp, swtp, swt2 = state
+    dt = max(0.0, t - last_t)
+    f = math.exp(-_BURN_DECAY * dt)
+    # Re-centre on t (tc -> tc - dt), then decay
+    swt2 = (swt2 - 2 * dt * swt + dt * dt * sw) * f
+    swtp = (swtp - dt * swp) * f
+    swt = (swt - dt * sw) * f
+    sw *= f
+    swp *= f
+    # New point sits at tc = 0 with weight 1
+    return [t, start_t, sw + 1.0, swt, swp + pct, swtp, swt2]
+
+
+def _append_history(history: dict, key: str, pct: int, now: float | None = None):
     """Append a timestamped pct snapshot, detect resets, and prune."""
-    now = datetime.now(timezone.utc).timestamp()
-    entries = history.setdefault(key, [])
+    if now is None:
+        now = time.time()
+    pct = int(pct)  # the sparkline LUT indexes by pct
+    series = history.setdefault(key, {"t": [], "pct": []})
+    ts, pcts = series["t"], series["pct"]
+    if ts and now < ts[-1]:
+        now = ts[-1]  # wall clock stepped back (NTP); keep the series ordered
+    burn = history.setdefault("_burn", {})
 
     # Detect reset: if pct dropped by ≥_RESET_DROP_PCT, discard old data.
     # This prevents stale pre-reset points from poisoning the regression.
-    if entries and (entries[-1]["pct"] - pct) >= _RESET_DROP_PCT:
-        entries.clear()
-
-    entries.append({"t": now, "pct": pct})
-    cutoff = now - HISTORY_MAX_AGE
-    history[key] = [e for e in entries if e["t"] >= cutoff]
-
-
-def _calc_burn_rate(history: dict, key: str) -> float | None:
-    """Recency-weighted linear regression over the last 30 min.
+    if pcts and (pcts[-1] - pct) >= _RESET_DROP_PCT:
+        ts.clear()
+        pcts.clear()
+        burn.pop(key, None)
+
+    state = burn.get(key)
+    if state is None:
+        # Seed from existing points (e.g. history saved by an older version)
+        for i in range(bisect.bisect_left(ts, now - _BURN_WINDOW), len(ts)):
+            state = _burn_update(state, ts[i], pcts[i])
+    burn[key] = _burn_update(state, now, pct)
+
+    ts.append(now)
+    pcts.append(pct)
+    # Timestamps are appended in order, so pruning is a bisect + slice
+    drop = bisect.bisect_left(ts, now - HISTORY_MAX_AGE)
+    if drop:
+        del ts[:drop]
+        del pcts[:drop]
+
+
+def _calc_burn_rate(history: dict, key: str, now: float | None = None) -> float | None:
+    """Recency-weighted linear regression over recent samples.
 
     Uses exponential decay weighting (half-life = 10 min) so recent
-    data points dominate and old bursts fade quickly.
-    Timestamps are centered around their mean for numerical stability.
+    data points dominate and old bursts fade quickly. The weighted sums
+    are maintained incrementally by _burn_update(); histories without
+    them fall back to a full pass over the last 30 min.
 
     Returns pct per minute (positive = increasing usage), or None if
     insufficient data or time span < 5 minutes.
     """
-    entries = history.get(key, [])
-    if len(entries) < 2:
-        return None
-    now = datetime.now(timezone.utc).timestamp()
-    cutoff = now - _BURN_WINDOW
-    recent = [e for e in entries if e["t"] >= cutoff]
-    if len(recent) < 2:
-        return None
+    if now is None:
+        now = time.time()
+    state = history.get("_burn", {}).get(key)
+    if state is None:
+        series = history.get(key)
+        if not series:
+            return None
+        ts, pcts = series["t"], series["pct"]
+        start = bisect.bisect_left(ts, now - _BURN_WINDOW)
+        for i in range(start, len(ts)):
+            state = _burn_update(state, ts[i], pcts[i])
+        if state is None:
+            return None
 
+    last_t, start_t, sw, swt, swp, swtp, swt2 = state
     # Require minimum time span to avoid noisy estimates from clustered points
-    span = recent[-1]["t"] - recent[0]["t"]
-    if span < _MIN_SPAN_SECS:
+    if now - last_t >= _BURN_WINDOW or last_t - start_t < _MIN_SPAN_SECS:
         return None
-
-    # Center timestamps for numerical stability
-    t_mean = sum(e["t"] for e in recent) / len(recent)
-
-    # Exponential decay weights: half-life of 10 minutes
-    half_life = 10 * 60  # seconds
-    decay = math.log(2) / half_life
-
-    # Weighted linear regression
-    sw = 0.0    # sum of weights
-    swt = 0.0   # sum of w * t_centered
-    swp = 0.0   # sum of w * pct
-    swtp = 0.0  # sum of w * t_centered * pct
-    swt2 = 0.0  # sum of w * t_centered^2
-
-    for e in recent:
-        tc = e["t"] - t_mean
-        w = math.exp(-decay * (now - e["t"]))
-        sw += w
-        swt += w * tc
-        swp += w * e["pct"]
-        swtp += w * tc * e["pct"]
-        swt2 += w * tc * tc
-
     denom = sw * swt2 - swt * swt
     if abs(denom) < 1e-10:
         return None
@@ -199,10 +281,10 @@ def _calc_eta_minutes(history: dict, key: str) -> int | None:
 
     Returns None if burn rate is non-positive or ETA > 10 hours.
     """
-    entries = history.get(key, [])
-    if not entries:
+    series = history.get(key)
+    if not series or not series["pct"]:
         return None
-    current_pct = entries[-1]["pct"]
+    current_pct = series["pct"][-1]
     rate = _calc_burn_rate(history, key)
     if rate is None or rate <= 0:
         return None
@@ -223,39 +305,166 @@ def _fmt_eta(minutes: int) -> str:
     return f"{h}h {m} min"
 
 
+_SPARK_BLOCKS = ("▁", "▂", "▃", "▄", "▅", "▆", "▇", "█")
+
+
+@functools.lru_cache(maxsize=128)
+def _spark_lut(span: int) -> tuple[str, ...]:
+    """Block char for every integer offset 0..span above the sparkline minimum."""
+    return tuple(_SPARK_BLOCKS[min(7, d * 7 // span)] for d in range(span + 1))
+
+
 def _sparkline(history: dict, key: str, width: int = 20) -> str:
     """Render a sparkline from history using block chars.
 
     Returns empty string if fewer than 3 points or no meaningful variation.
     """
-    entries = history.get(key, [])
-    if len(entries) < 3:
+    series = history.get(key)
+    if not series or len(series["pct"]) < 3:
         return ""
-    blocks = "▁▂▃▄▅▆▇█"
-    pts = [e["pct"] for e in entries[-width:]]
+    pts = series["pct"][-width:]
     lo, hi = min(pts), max(pts)
     # Skip if all values are the same (no variation → flat line looks bad)
     if hi - lo < 2:
         return ""
-    span = hi - lo
-    return "".join(blocks[min(7, int((p - lo) / span * 7))] for p in pts)
+    lut = _spark_lut(hi - lo)
+    return "".join([lut[p - lo] for p in pts])
 
 
 # ── SQLite history functions ──────────────────────────────────────────────────
 
+# Statements are module constants so every call passes the identical string
+# and hits sqlite3's per-connection prepared-statement cache.
+_SQL_INSERT_SAMPLE = "INSERT INTO samples (ts, key, pct, reps) VALUES (?, ?, ?, ?)"
+_SQL_SAMPLES_SINCE = "SELECT ts, key, pct FROM samples WHERE ts >= ? ORDER BY ts"
+# A day is rolled up once, on the first rollup after it ends; samples kept
+# for the 24 h window afterwards only cover part of it and must not overwrite.
+_SQL_INSERT_DAILY = """
+    INSERT INTO daily_stats (date, key, peak_pct, avg_pct, limit_hits, samples)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date, key) DO NOTHING
+"""
+# Samples since ? with n = the number of refreshes each row stands for:
+# itself plus the unchanged refreshes skipped after it, which the next row
+# of the same key records in reps (see _record_samples).
+_SQL_WEIGHTED = """
+    SELECT ts, key, pct,
+           1 + COALESCE(LEAD(reps) OVER (PARTITION BY key ORDER BY ts), 0) AS n
+    FROM samples WHERE ts >= ?
+"""
+# Aggregate samples in [?, ?) per key; ts is compared as a plain range so
+# the ts index is usable (date(ts, 'unixepoch') in WHERE forces a scan).
+_SQL_RANGE_STATS = f"""
+    SELECT key, MAX(pct), CAST(SUM(pct * n) / SUM(n) AS INTEGER), SUM(n),
+           SUM(CASE WHEN pct >= ? THEN n ELSE 0 END)
+    FROM ({_SQL_WEIGHTED})
+    WHERE ts < ?
+    GROUP BY key
+"""
+_SQL_ROLLUP = f"""
+    SELECT strftime('%Y-%m-%d', ts, 'unixepoch') AS d, key,
+           MAX(pct), CAST(SUM(pct * n) / SUM(n) AS INTEGER),
+           SUM(CASE WHEN pct >= ? THEN n ELSE 0 END), SUM(n)
+    FROM ({_SQL_WEIGHTED})
+    WHERE ts < ?
+    GROUP BY d, key
+"""
+_SQL_WEEKLY_STATS_ALL = (
+    "SELECT key, date, peak_pct, avg_pct, limit_hits, samples FROM daily_stats "
+    "WHERE date >= ? ORDER BY key, date"
+)
+# Rolled-up hits from daily_stats plus today's hits in samples (earlier
+# samples kept for the 24 h window are already counted in daily_stats)
+_SQL_WEEK_HITS = """
+    SELECT key, SUM(n) FROM (
+        SELECT key, limit_hits AS n FROM daily_stats WHERE date >= ?
+        UNION ALL
+        SELECT key, COUNT(*) FROM samples WHERE pct >= ? AND ts >= ? GROUP BY key
+    ) GROUP BY key
+"""
+# Rolled-up days plus today's live aggregate in one result set, by date
+_SQL_HISTORY_ROWS = """
+    SELECT date, key, peak_pct, avg_pct, limit_hits, samples
+    FROM daily_stats WHERE date >= :cutoff
+    UNION ALL
+    SELECT :today, key, MAX(pct), CAST(SUM(pct * n) / SUM(n) AS INTEGER),
+           SUM(CASE WHEN pct >= :lim THEN n ELSE 0 END), SUM(n)
+    FROM (SELECT ts, key, pct,
+                 1 + COALESCE(LEAD(reps) OVER (PARTITION BY key ORDER BY ts), 0) AS n
+          FROM samples WHERE ts >= :start)
+    WHERE ts < :end
+    GROUP BY key
+    ORDER BY 1
+"""
+_SQL_INTRADAY = "SELECT key, ts, pct FROM samples WHERE ts >= ? AND ts < ? ORDER BY ts"
+
+
+def _utc_date(ts: float, days_ago: int = 0) -> str:
+    """Return the 'YYYY-MM-DD' UTC date of ts, optionally days_ago earlier."""
+    return time.strftime("%Y-%m-%d", time.gmtime(ts - days_ago * 86400))
+
+
+_MONTH_ABBR = ("", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+@functools.lru_cache(maxsize=128)
+def _pretty_key(key: str) -> str:
+    """History key → display name: 'chatgpt_api' → 'ChatGPT API'."""
+    return (key.replace("_", " ").title()
+            .replace("Chatgpt", "ChatGPT").replace("Api", "API"))
+
+
+@functools.lru_cache(maxsize=512)
+def _fmt_date_label(ds: str) -> str:
+    """'YYYY-MM-DD' → 'Mon Jan 05'; unparseable input is returned as-is."""
+    try:
+        d = date(int(ds[0:4]), int(ds[5:7]), int(ds[8:10]))
+    except (ValueError, TypeError):
+        return ds
+    return f"{_DAYS[d.weekday()]} {_MONTH_ABBR[d.month]} {d.day:02d}"
+
+
+def _format_day_info(ds: str, detail: dict | None) -> str:
+    """Heatmap info line: 'Mon Jan 05  —  Claude 42%  ·  Copilot 10%'."""
+    parts = "  \u00b7  ".join(
+        f"{_pretty_key(key)} {stats['avg_pct']}%"
+        for key, stats in sorted((detail or {}).items())
+    )
+    return f"{_fmt_date_label(ds)}  \u2014  {parts or 'No data'}"
+
+
+# Bumped whenever samples/daily_stats change; keys the history-window memo.
+_history_gen = 0
+_history_data_memo: dict = {}   # {"key": (today, gen), "data": ...}
+
+
+def _bump_history_gen():
+    global _history_gen
+    _history_gen += 1
+
+
 def _init_history_db() -> sqlite3.Connection:
     """Create/open the SQLite history database. Returns a WAL-mode connection."""
     os.makedirs(os.path.dirname(HISTORY_DB), exist_ok=True)
     conn = sqlite3.connect(HISTORY_DB, check_same_thread=False)
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL only fsyncs at checkpoints, not on every commit.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
     conn.execute("""
         CREATE TABLE IF NOT EXISTS samples (
             ts   REAL NOT NULL,
             key  TEXT NOT NULL,
-            pct  INTEGER NOT NULL
+            pct  INTEGER NOT NULL,
+            reps INTEGER NOT NULL DEFAULT 0
         )
     """)
+    if "reps" not in {r[1] for r in conn.execute("PRAGMA table_info(samples)")}:
+        conn.execute("ALTER TABLE samples ADD COLUMN reps INTEGER NOT NULL DEFAULT 0")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_samples_key_ts ON samples(key, ts)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_samples_ts ON samples(ts)")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS daily_stats (
             date       TEXT NOT NULL,
@@ -271,106 +480,186 @@ def _init_history_db() -> sqlite3.Connection:
     return conn
 
 
-def _record_sample(conn: sqlite3.Connection, key: str, pct: int):
-    """Insert one usage sample into the samples table."""
-    now = datetime.now(timezone.utc).timestamp()
-    conn.execute("INSERT INTO samples (ts, key, pct) VALUES (?, ?, ?)", (now, key, pct))
+def _open_history_reader() -> sqlite3.Connection:
+    """Read-only connection for the menu and history window (main thread).
+
+    Under WAL it reads the last committed state while the db thread writes.
+    """
+    conn = sqlite3.connect(f"file:{urllib.parse.quote(HISTORY_DB)}?mode=ro", uri=True,
+                           check_same_thread=False)
+    conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+# key -> (ts, pct) last written, and how many identical refreshes were skipped since
+_last_recorded: dict[str, tuple[float, int, int]] = {}
+
+
+def _record_samples(conn: sqlite3.Connection, samples: dict[str, int],
+                    now: float | None = None) -> bool:
+    """Insert one refresh cycle's {key: pct} snapshot. Call _flush_history() after.
+
+    Returns True if any row was inserted; the caller bumps _history_gen
+    once the commit lands, so readers never pair the new gen with old rows.
+
+    A pct identical to the last recorded one is skipped unless
+    _SAMPLE_KEEPALIVE has passed (so idle stretches still get anchor rows)
+    or it is at the limit (so limit-hit counts stay exact). The next row
+    written for the key carries the skip count in reps, so the rollup can
+    still weight each stored row by the refreshes it stands for.
+    """
+    if now is None:
+        now = time.time()
+    rows = []
+    for key, pct in samples.items():
+        pct = int(pct)  # daily peaks feed the weekly sparkline LUT
+        last = _last_recorded.get(key)
+        if (last and last[1] == pct and pct < _LIMIT_HIT_PCT
+                and now - last[0] < _SAMPLE_KEEPALIVE):
+            _last_recorded[key] = (last[0], pct, last[2] + 1)
+            continue
+        rows.append((now, key, pct, last[2] if last else 0))
+        _last_recorded[key] = (now, pct, 0)
+    if rows:
+        conn.executemany(_SQL_INSERT_SAMPLE, rows)
+    return bool(rows)
+
+
+def _flush_history(conn: sqlite3.Connection):
+    """Commit pending sample inserts (once per refresh cycle)."""
     conn.commit()
 
 
-def _rollup_daily_stats(conn: sqlite3.Connection):
-    """Aggregate completed days from samples into daily_stats, then prune old data."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-    # Find all distinct dates in samples that are before today
-    rows = conn.execute(
-        "SELECT DISTINCT date(ts, 'unixepoch') AS d FROM samples WHERE d < ? ORDER BY d",
-        (today,),
-    ).fetchall()
-
-    for (day,) in rows:
-        # Aggregate that day's samples per key
-        agg = conn.execute("""
-            SELECT key, MAX(pct), CAST(AVG(pct) AS INTEGER), COUNT(*),
-                   SUM(CASE WHEN pct >= ? THEN 1 ELSE 0 END)
-            FROM samples
-            WHERE date(ts, 'unixepoch') = ?
-            GROUP BY key
-        """, (_LIMIT_HIT_PCT, day)).fetchall()
-
-        for key, peak, avg, cnt, hits in agg:
-            conn.execute("""
-                INSERT INTO daily_stats (date, key, peak_pct, avg_pct, limit_hits, samples)
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date, key) DO UPDATE SET
-                    peak_pct=excluded.peak_pct, avg_pct=excluded.avg_pct,
-                    limit_hits=excluded.limit_hits, samples=excluded.samples
-            """, (day, key, peak, avg, hits, cnt))
-
-        # Delete rolled-up samples
-        conn.execute("DELETE FROM samples WHERE date(ts, 'unixepoch') = ?", (day,))
+def _migrate_legacy_history(conn: sqlite3.Connection):
+    """Import the old JSON history file into samples, then delete it.
+
+    Both stores were written side by side, so only points older than the
+    first SQLite sample for each key are new to the database. Days that
+    already have a daily_stats row were rolled up from complete samples;
+    their points are skipped so the partial JSON window can't replace them.
+    """
+    try:
+        with open(_LEGACY_HISTORY_FILE) as f:
+            legacy = json.load(f)
+    except FileNotFoundError:
+        return
+    except (json.JSONDecodeError, OSError):
+        legacy = {}
+    first = dict(conn.execute("SELECT key, MIN(ts) FROM samples GROUP BY key"))
+    rolled = set(conn.execute("SELECT date, key FROM daily_stats WHERE date >= ?",
+                              (_utc_date(time.time(), 2),)))
+    rows = []
+    for key, entries in legacy.items():
+        if isinstance(entries, list):
+            pts = [(e["t"], e["pct"]) for e in entries]
+        elif isinstance(entries, dict) and "t" in entries:
+            pts = list(zip(entries["t"], entries["pct"]))
+        else:
+            continue  # "_burn" sums are rebuilt from samples
+        cutoff = first.get(key, float("inf"))
+        rows.extend((t, key, int(p), 0) for t, p in pts
+                    if t < cutoff and (_utc_date(t), key) not in rolled)
+    if rows:
+        conn.executemany(_SQL_INSERT_SAMPLE, rows)
+        conn.commit()
+        _bump_history_gen()
+    log.info("migrated %d legacy history points to SQLite", len(rows))
+    try:
+        os.remove(_LEGACY_HISTORY_FILE)
+    except OSError:
+        pass
+
+
+def _load_history(conn: sqlite3.Connection) -> dict:
+    """Rebuild the in-memory history window from the last 24 h of samples.
+
+    Returns {"claude": {"t": [...], "pct": [...]}, ..., "_burn": {...}}.
+    """
+    history: dict = {}
+    since = time.time() - HISTORY_MAX_AGE
+    for ts, key, pct in conn.execute(_SQL_SAMPLES_SINCE, (since,)):
+        _append_history(history, key, pct, now=ts)
+    return history
+
+
+def _rollup_daily_stats(conn: sqlite3.Connection, now: float | None = None,
+                        commit: bool = True):
+    """Aggregate completed days from samples into daily_stats, then prune old data.
+
+    Samples are pruned to HISTORY_MAX_AGE, never past the start of a day
+    that has not been rolled up yet, so each day is aggregated whole.
+
+    commit=False leaves the work in the caller's open transaction; the
+    caller then bumps _history_gen after its own commit.
+    """
+    if now is None:
+        now = time.time()
+    today_start = now - now % 86400  # UTC midnight
+
+    # One pass over everything before today. The row weights look at the
+    # following row, so the window runs over the whole (24 h + today) table.
+    agg = conn.execute(_SQL_ROLLUP, (_LIMIT_HIT_PCT, 0, today_start)).fetchall()
+    conn.executemany(_SQL_INSERT_DAILY, agg)
+
+    # Delete rolled-up samples, keeping the last 24 h for _load_history()
+    conn.execute("DELETE FROM samples WHERE ts < ?", (now - HISTORY_MAX_AGE,))
 
     # Prune old data
-    cutoff_samples = (datetime.now(timezone.utc) - timedelta(days=_SAMPLES_MAX_DAYS)).timestamp()
+    cutoff_samples = now - _SAMPLES_MAX_DAYS * 86400
     conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff_samples,))
-    cutoff_daily = (datetime.now(timezone.utc) - timedelta(days=_DAILY_MAX_DAYS)).strftime("%Y-%m-%d")
+    cutoff_daily = _utc_date(now, _DAILY_MAX_DAYS)
     conn.execute("DELETE FROM daily_stats WHERE date < ?", (cutoff_daily,))
-    conn.commit()
+    if commit:
+        conn.commit()
+        _bump_history_gen()
 
 
-def _get_weekly_stats(conn: sqlite3.Connection, key: str) -> list[dict]:
-    """Return last 7 days of daily_stats for a given key, ordered by date."""
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
-    rows = conn.execute(
-        "SELECT date, peak_pct, avg_pct, limit_hits, samples FROM daily_stats "
-        "WHERE key = ? AND date >= ? ORDER BY date",
-        (key, cutoff),
-    ).fetchall()
-    return [
-        {"date": r[0], "peak_pct": r[1], "avg_pct": r[2], "limit_hits": r[3], "samples": r[4]}
-        for r in rows
-    ]
+def _get_weekly_stats_all(conn: sqlite3.Connection,
+                          now: float | None = None) -> dict[str, list[dict]]:
+    """Last 7 days of daily_stats for every key in one query.
+
+    Returns {key: [{"date", "peak_pct", ...}, ...]}, keys sorted, days by date.
+    """
+    cutoff = _utc_date(time.time() if now is None else now, 7)
+    out: dict[str, list[dict]] = {}
+    for key, *r in conn.execute(_SQL_WEEKLY_STATS_ALL, (cutoff,)):
+        out.setdefault(key, []).append(
+            {"date": r[0], "peak_pct": r[1], "avg_pct": r[2],
+             "limit_hits": r[3], "samples": r[4]}
+        )
+    return out
 
 
-def _get_week_limit_hits(conn: sqlite3.Connection, key: str) -> int:
-    """Return total number of limit-hit samples in the past 7 days."""
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
-    row = conn.execute(
-        "SELECT COALESCE(SUM(limit_hits), 0) FROM daily_stats WHERE key = ? AND date >= ?",
-        (key, cutoff),
-    ).fetchone()
-    # Also count today's samples that are at limit
-    cutoff_ts = (datetime.now(timezone.utc) - timedelta(days=7)).timestamp()
-    today_row = conn.execute(
-        "SELECT COUNT(*) FROM samples WHERE key = ? AND pct >= ? AND ts >= ?",
-        (key, _LIMIT_HIT_PCT, cutoff_ts),
-    ).fetchone()
-    return (row[0] if row else 0) + (today_row[0] if today_row else 0)
+def _get_week_limit_hits(conn: sqlite3.Connection,
+                         now: float | None = None) -> dict[str, int]:
+    """Return {key: number of limit-hit samples in the past 7 days}."""
+    if now is None:
+        now = time.time()
+    return dict(conn.execute(
+        _SQL_WEEK_HITS, (_utc_date(now, 7), _LIMIT_HIT_PCT, now - now % 86400)
+    ))
 
 
 def _weekly_sparkline(daily_stats: list[dict], width: int = 7) -> str:
     """Render a 7-day sparkline from daily peak values."""
     if len(daily_stats) < 2:
         return ""
-    blocks = "▁▂▃▄▅▆▇█"
     pts = [d["peak_pct"] for d in daily_stats[-width:]]
     lo, hi = min(pts), max(pts)
     if hi - lo < 2:
         return ""
-    span = hi - lo
-    return "".join(blocks[min(7, int((p - lo) / span * 7))] for p in pts)
+    lut = _spark_lut(hi - lo)
+    return "".join([lut[p - lo] for p in pts])
 
 
-def _get_today_stats(conn: sqlite3.Connection) -> dict[str, dict]:
+def _get_today_stats(conn: sqlite3.Connection, now: float | None = None) -> dict[str, dict]:
     """Compute live stats from today's samples (not yet rolled up)."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    rows = conn.execute("""
-        SELECT key, MAX(pct), CAST(AVG(pct) AS INTEGER), COUNT(*),
-               SUM(CASE WHEN pct >= ? THEN 1 ELSE 0 END)
-        FROM samples
-        WHERE date(ts, 'unixepoch') = ?
-        GROUP BY key
-    """, (_LIMIT_HIT_PCT, today)).fetchall()
+    if now is None:
+        now = time.time()
+    today = _utc_date(now)
+    day_start = now - now % 86400
+    day_end = day_start + 86400
+    rows = conn.execute(_SQL_RANGE_STATS, (_LIMIT_HIT_PCT, day_start, day_end)).fetchall()
     result = {}
     for key, peak, avg, cnt, hits in rows:
         result[key] = {
@@ -380,48 +669,57 @@ def _get_today_stats(conn: sqlite3.Connection) -> dict[str, dict]:
     return result
 
 
-def _fetch_history_data(conn: sqlite3.Connection) -> dict | None:
-    """Gather all history data for the Usage History window."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    cutoff_90 = (datetime.now(timezone.utc) - timedelta(days=90)).strftime("%Y-%m-%d")
+def _fetch_history_data(conn: sqlite3.Connection, now: float | None = None) -> dict | None:
+    """Gather all history data for the Usage History window.
 
-    # All daily_stats rows within 90 days
-    past_rows = conn.execute(
-        "SELECT date, key, peak_pct, avg_pct, limit_hits, samples "
-        "FROM daily_stats WHERE date >= ? ORDER BY date",
-        (cutoff_90,),
-    ).fetchall()
-
-    # Today's live data
-    today_stats = _get_today_stats(conn)
+    Memoized until the next sample/rollup or UTC day change; callers must
+    treat the result as read-only.
+    """
+    if now is None:
+        now = time.time()
+    today = _utc_date(now)
+    memo_key = (today, _history_gen)
+    if _history_data_memo.get("key") == memo_key:
+        return _history_data_memo["data"]
+    data = _build_history_data(conn, now, today)
+    _history_data_memo["key"] = memo_key
+    _history_data_memo["data"] = data
+    return data
+
+
+def _build_history_data(conn: sqlite3.Connection, now: float, today: str) -> dict | None:
+    """Uncached body of _fetch_history_data()."""
+    today_start = now - now % 86400
+    cutoff_90 = _utc_date(now, 90)
+    cutoff_7 = _utc_date(now, 7)
+
+    # 90 days of daily_stats plus today's live data, ordered by date
+    rows = conn.execute(_SQL_HISTORY_ROWS, {
+        "cutoff": cutoff_90, "today": today, "lim": _LIMIT_HIT_PCT,
+        "start": today_start, "end": today_start + 86400,
+    }).fetchall()
 
     # Merge into per-key and per-day structures
     per_key: dict[str, list[dict]] = {}
     per_day: dict[str, int] = {}  # date -> max avg across all providers (daily metric)
     per_day_detail: dict[str, dict] = {}  # date -> {key: {peak_pct, avg_pct}}
-
-    for date, key, peak, avg, hits, cnt in past_rows:
-        per_key.setdefault(key, []).append({
-            "date": date, "peak_pct": peak, "avg_pct": avg,
+    weekly_start: dict[str, int] = {}     # key -> index of first row in last 7 days
+
+    for ds, key, peak, avg, hits, cnt in rows:
+        stats = per_key.setdefault(key, [])
+        if key not in weekly_start and ds >= cutoff_7:
+            weekly_start[key] = len(stats)
+        stats.append({
+            "date": ds, "peak_pct": peak, "avg_pct": avg,
             "limit_hits": hits, "samples": cnt,
         })
-        per_day[date] = max(per_day.get(date, 0), avg)
-        per_day_detail.setdefault(date, {})[key] = {"peak_pct": peak, "avg_pct": avg}
-
-    for key, stat in today_stats.items():
-        per_key.setdefault(key, []).append(stat)
-        per_day[today] = max(per_day.get(today, 0), stat["avg_pct"])
-        per_day_detail.setdefault(today, {})[key] = {
-            "peak_pct": stat["peak_pct"], "avg_pct": stat["avg_pct"],
-        }
+        per_day[ds] = max(per_day.get(ds, 0), avg)
+        per_day_detail.setdefault(ds, {})[key] = {"peak_pct": peak, "avg_pct": avg}
 
     # Intraday 5-hour windows for today (from raw samples)
     today_windows: dict[str, dict[int, int]] = {}
     try:
-        raw = conn.execute(
-            "SELECT key, ts, pct FROM samples WHERE date(ts, 'unixepoch') = ? ORDER BY ts",
-            (today,),
-        ).fetchall()
+        raw = conn.execute(_SQL_INTRADAY, (today_start, today_start + 86400)).fetchall()
         for key, ts, pct in raw:
             dt = datetime.fromtimestamp(ts, tz=timezone.utc)
             widx = min(dt.hour // 5, 4)
@@ -434,7 +732,6 @@ def _fetch_history_data(conn: sqlite3.Connection) -> dict | None:
         return None
 
     # Build provider summaries
-    _day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     providers = []
     for key in sorted(per_key):
         stats = per_key[key]
@@ -452,12 +749,10 @@ def _fetch_history_data(conn: sqlite3.Connection) -> dict | None:
                     break
             else:
                 color = "#AAAAAA"
-        label = (key.replace("_", " ").title()
-                 .replace("Chatgpt", "ChatGPT").replace("Api", "API"))
+        label = _pretty_key(key)
 
-        # Last 7 days for bar chart
-        cutoff_7 = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d")
-        weekly = [d for d in stats if d["date"] >= cutoff_7]
+        # Last 7 days for bar chart (rows are date-ordered)
+        weekly = stats[weekly_start.get(key, len(stats)):]
 
         providers.append({
             "key": key, "label": label, "color": color,
@@ -472,13 +767,6 @@ def _fetch_history_data(conn: sqlite3.Connection) -> dict | None:
     total_hits = sum(p["hits"] for p in providers)
     earliest = min(per_day.keys())
 
-    def _fmt_day(date_str):
-        try:
-            dt = datetime.strptime(date_str, "%Y-%m-%d")
-            return f"{_day_names[dt.weekday()]} {dt.strftime('%b %d')}"
-        except Exception:
-            return date_str
-
     return {
         "days": per_day,
         "providers": providers,
@@ -487,8 +775,8 @@ def _fetch_history_data(conn: sqlite3.Connection) -> dict | None:
         "summary": {
             "total_days": len(per_day),
             "earliest": earliest,
-            "highest": (_fmt_day(highest[0]), highest[1]),
-            "lowest": (_fmt_day(lowest[0]), lowest[1]),
+            "highest": (_fmt_date_label(highest[0]), highest[1]),
+            "lowest": (_fmt_date_label(lowest[0]), lowest[1]),
             "avg": avg_overall,
             "total_hits": total_hits,
         },
@@ -498,25 +786,93 @@ def _fetch_history_data(conn: sqlite3.Connection) -> dict | None:
 # ── config ────────────────────────────────────────────────────────────────────
 
 def load_config() -> dict:
-    if os.path.exists(CONFIG_FILE):
+    try:
+        with open(CONFIG_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, OSError) as e:
+        corrupt = CONFIG_FILE + ".bak"
+        log.warning("Config file corrupt (%s), resetting. Backup at %s", e, corrupt)
         try:
-            with open(CONFIG_FILE) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError) as e:
-            corrupt = CONFIG_FILE + ".bak"
-            log.warning("Config file corrupt (%s), resetting. Backup at %s", e, corrupt)
-            try:
-                os.replace(CONFIG_FILE, corrupt)
-            except OSError:
-                pass
+            os.replace(CONFIG_FILE, corrupt)
+        except OSError:
+            pass
     return {}
 
 
+_config_write_lock = threading.Lock()   # one writer of CONFIG_FILE(.tmp) at a time
+_config_save_timer: threading.Timer | None = None
+_CONFIG_SAVE_DELAY = 2.0   # seconds to coalesce rapid toggles into one write
+
+
+def _json_bytes(obj, indent: bool = False) -> bytes:
+    """Serialize with orjson when installed, else the stdlib json module."""
+    if _ORJSON_OK:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:   # orjson.JSONEncodeError, e.g. non-str keys
+            pass
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
 def save_config(cfg: dict):
-    tmp = CONFIG_FILE + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(cfg, f, indent=2)
-    os.replace(tmp, CONFIG_FILE)
+    # Cookies may have been replaced — drop parsed copies of the old ones
+    parse_cookie_string.cache_clear()
+    _request_cookies.cache_clear()
+    with _config_write_lock:
+        tmp = CONFIG_FILE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_json_bytes(cfg, indent=True))  # users edit this file by hand
+            # Durable before the rename, so a crash leaves old or new, never
+            # an empty file. Cheap now that writes are debounced.
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, CONFIG_FILE)
+        try:
+            dfd = os.open(os.path.dirname(CONFIG_FILE), os.O_RDONLY)
+            try:
+                os.fsync(dfd)   # persist the rename itself
+            finally:
+                os.close(dfd)
+        except OSError:
+            pass
+
+
+def _save_config_soon(cfg: dict):
+    """Debounced save_config(): repeated calls within the delay write once.
+
+    The timer gets a snapshot taken now: the live dict keeps changing on
+    the main and fetch threads while the timer waits.
+    """
+    global _config_save_timer
+    with _config_write_lock:
+        snapshot = copy.deepcopy(cfg)
+        if _config_save_timer is not None:
+            _config_save_timer.cancel()
+        _config_save_timer = threading.Timer(_CONFIG_SAVE_DELAY, _flush_config_save,
+                                             (snapshot,))
+        _config_save_timer.daemon = True
+        _config_save_timer.start()
+
+
+def _flush_config_save(cfg: dict | None = None):
+    """Write a pending debounced save now (timer callback and exit hook)."""
+    global _config_save_timer
+    with _config_write_lock:
+        timer, _config_save_timer = _config_save_timer, None
+    if timer is None:
+        return
+    timer.cancel()
+    try:
+        save_config(cfg if cfg is not None else timer.args[0])
+    except Exception:
+        log.exception("deferred config save failed")
+
+
+atexit.register(_flush_config_save)
 
 
 def _notif_enabled(cfg: dict, key: str) -> bool:
@@ -527,19 +883,26 @@ def _notif_enabled(cfg: dict, key: str) -> bool:
 def _set_notif(cfg: dict, key: str, value: bool):
     """Persist a single notification toggle."""
     cfg.setdefault("notifications", {})[key] = value
-    save_config(cfg)
+    _save_config_soon(cfg)
 
 
 # ── data models ───────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class LimitRow:
     label: str
     pct: int          # 0–100
     reset_str: str    # e.g. "resets in 1h 23m" or "resets Thu 00:00"
+    # Unix time of the reset, when known; lets a cached row re-render reset_str
+    reset_at: float | None = field(default=None, compare=False)
+    # History key suffix derived from label, e.g. "5h_limit"
+    hkey_suffix: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        self.hkey_suffix = self.label.lower().replace(" ", "_")
 
-@dataclass
+
+@dataclass(slots=True)
 class UsageData:
     session: LimitRow | None = None
     weekly_all: LimitRow | None = None
@@ -548,7 +911,7 @@ class UsageData:
     raw: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderData:
     """Usage/billing data for a third-party API provider."""
     name: str
@@ -558,6 +921,8 @@ class ProviderData:
     currency: str = "USD"
     period: str = "this month"
     error: str | None = None
+    # Per-limit rows for multi-limit providers (ChatGPT, Cursor)
+    _rows: list[LimitRow] | None = field(default=None, repr=False)
 
     @property
     def pct(self) -> int | None:
@@ -581,30 +946,75 @@ _IMPERSONATE = "safari184"
 _CF_COOKIE_KEYS = frozenset({"cf_clearance", "__cf_bm", "_cfuvid"})
 
 
-def parse_cookie_string(raw: str) -> dict:
-    """Parse 'key=val; key2=val2' or just a bare sessionKey value."""
+@functools.lru_cache(maxsize=32)
+def parse_cookie_string(raw: str) -> types.MappingProxyType:
+    """Parse 'key=val; key2=val2' or just a bare sessionKey value.
+
+    Cached per raw string; the result is a read-only view of the shared dict.
+    """
     raw = raw.strip()
     if "=" not in raw:
-        return {"sessionKey": raw}
+        return types.MappingProxyType({"sessionKey": raw})
     cookies = {}
     for part in raw.split(";"):
         part = part.strip()
         if "=" in part:
             k, _, v = part.partition("=")
             cookies[k.strip()] = v.strip()
-    return cookies
+    return types.MappingProxyType(cookies)
 
 
 def _strip_cf_cookies(cookies: dict) -> dict:
     return {k: v for k, v in cookies.items() if k not in _CF_COOKIE_KEYS}
 
 
+@functools.lru_cache(maxsize=16)
+def _request_cookies(cookie_str: str) -> dict:
+    """Parsed cookies minus Cloudflare keys, cached per raw cookie string.
+
+    The same strings are sent on every refresh, so this is parsed once.
+    Shared between callers — treat the result as read-only.
+    """
+    return _strip_cf_cookies(parse_cookie_string(cookie_str))
+
+
+# One curl_cffi Session per thread: keeps TLS connections alive between
+# refreshes instead of paying a full handshake on every request.
+_http_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """This thread's Session, with its cookie jar emptied.
+
+    Cookies are passed explicitly per request; anything a response set
+    (__cf_bm, a replaced account's session) must not ride along on the next.
+    """
+    s = getattr(_http_local, "session", None)
+    if s is None:
+        s = requests.Session(impersonate=_IMPERSONATE)
+        _http_local.session = s
+    else:
+        s.cookies.clear()
+    return s
+
+
+# Shared pool for network fetches so providers are queried concurrently;
+# each worker thread keeps its own Session (see _session()).
+_fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fetch")
+# Fire-and-forget subprocess/file work kept off the AppKit main thread.
+# One worker, so launchctl load/unload run in the order they were requested.
+_io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io")
+# Sole owner of the history DB write connection: opening, sample inserts and
+# rollups are queued here, so writes never interleave across threads.
+_db_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+
+
 def _get(url: str, cookies: dict) -> dict | list:
-    r = requests.get(
-        url, cookies=_strip_cf_cookies(cookies), headers=HEADERS, timeout=15,
-        impersonate=_IMPERSONATE,
+    r = _session().get(
+        url, cookies=cookies, headers=HEADERS, timeout=15,
     )
-    log.debug("GET %s  status=%s  body=%s", url, r.status_code, r.text[:800])
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("GET %s  status=%s  body=%s", url, r.status_code, r.text[:800])
     r.raise_for_status()
     return r.json()
 
@@ -640,13 +1050,29 @@ def _org_id_from_api(cookies: dict) -> str | None:
 
 
 
+# Org ids discovered via _org_id_from_api, keyed by _cookie_hash(cookie_str).
+# Seeded from / persisted to config["org_id_cache"] by ClaudeBar.
+_org_id_cache: dict[str, str] = {}
+
+
+def _cookie_hash(cookie_str: str) -> str:
+    return hashlib.blake2b(cookie_str.encode(), digest_size=16).hexdigest()
+
+
 def fetch_raw(cookie_str: str) -> dict:
-    cookies = parse_cookie_string(cookie_str)
+    cookies = _request_cookies(cookie_str)
     log.debug("using cookies keys: %s", list(cookies.keys()))
 
     org_id = _org_id_from_cookies(cookies)
     log.debug("org_id from cookie: %s", org_id)
 
+    ck = None
+    if not org_id:
+        ck = _cookie_hash(cookie_str)
+        org_id = _org_id_cache.get(ck)
+        log.debug("org_id from cache: %s", org_id)
+    cached = bool(org_id) and ck is not None
+
     if not org_id:
         org_id = _org_id_from_api(cookies)
         log.debug("org_id from api: %s", org_id)
@@ -656,19 +1082,28 @@ def fetch_raw(cookie_str: str) -> dict:
             "Could not find organization id.\n"
             "Make sure you copied ALL cookies (including lastActiveOrg)."
         )
+    if ck is not None:
+        _org_id_cache[ck] = org_id
 
-    usage = _get(
-        f"https://claude.ai/api/organizations/{org_id}/usage", cookies
-    )
-    log.debug("usage full response: %s", json.dumps(usage, indent=2))
+    try:
+        usage = _get(
+            f"https://claude.ai/api/organizations/{org_id}/usage", cookies
+        )
+    except CurlHTTPError as e:
+        code = getattr(getattr(e, "response", None), "status_code", 0)
+        if not cached or code not in (401, 403, 404):
+            raise
+        # Cached org may be stale (left org / switched account): rediscover once
+        _org_id_cache.pop(ck, None)
+        return fetch_raw(cookie_str)
+    log.debug("usage full response: %s", _LazyJSON(usage))
     return {"usage": usage, "org_id": org_id}
 
 
 # ── third-party provider APIs ────────────────────────────────────────────────
 
 def _api_get(url: str, headers: dict, cookies: dict | None = None) -> dict:
-    clean = _strip_cf_cookies(cookies) if cookies else None
-    r = requests.get(url, headers=headers, cookies=clean, timeout=10, impersonate=_IMPERSONATE)
+    r = _session().get(url, headers=headers, cookies=cookies, timeout=10)
     r.raise_for_status()
     return r.json()
 
@@ -691,8 +1126,10 @@ def _parse_wham_window(window: dict, label: str) -> LimitRow | None:
         return None
     pw = window.get("primary_window") or {}
     pct = min(100, int(pw.get("used_percent", 0)))
-    reset_str = _fmt_reset(pw.get("reset_at")) if pw.get("reset_at") else ""
-    return LimitRow(label, pct, reset_str)
+    reset_at = pw.get("reset_at")
+    reset_str = _fmt_reset(reset_at) if reset_at else ""
+    return LimitRow(label, pct, reset_str,
+                    reset_at if isinstance(reset_at, (int, float)) else None)
 
 
 def _parse_wham_usage(data: dict) -> ProviderData:
@@ -703,7 +1140,7 @@ def _parse_wham_usage(data: dict) -> ProviderData:
       rate_limit.primary_window.reset_at      (Unix timestamp)
       code_review_rate_limit  — same structure
     """
-    log.debug("wham/usage raw: %s", json.dumps(data, indent=2))
+    log.debug("wham/usage raw: %s", _LazyJSON(data))
 
     rows: list[LimitRow] = []
 
@@ -735,7 +1172,7 @@ def _parse_wham_usage(data: dict) -> ProviderData:
 
 def fetch_chatgpt(cookie_str: str) -> ProviderData:
     """Fetch ChatGPT / Codex usage via /backend-api/wham/usage."""
-    cookies = parse_cookie_string(cookie_str)
+    cookies = _request_cookies(cookie_str)
     try:
         token = _chatgpt_access_token(cookies)
         if not token:
@@ -804,21 +1241,20 @@ def fetch_glm(api_key: str) -> ProviderData:
 
 def fetch_copilot(cookie_str: str) -> ProviderData:
     """Fetch GitHub Copilot premium request usage via browser cookies."""
-    cookies = parse_cookie_string(cookie_str)
+    cookies = _request_cookies(cookie_str)
     try:
-        r = requests.get(
+        r = _session().get(
             "https://github.com/settings/billing/copilot_usage_card",
-            cookies=_strip_cf_cookies(cookies),
+            cookies=cookies,
             headers={
                 "Accept": "application/json",
                 "Referer": "https://github.com/settings/billing/premium_requests_usage",
             },
             timeout=10,
-            impersonate=_IMPERSONATE,
         )
         r.raise_for_status()
         data = r.json()
-        log.debug("copilot_usage_card: %s", json.dumps(data, indent=2))
+        log.debug("copilot_usage_card: %s", _LazyJSON(data))
         used = float(data.get("discountQuantity", 0))
         limit = float(data.get("userPremiumRequestEntitlement", 0))
         return ProviderData(
@@ -832,44 +1268,36 @@ def fetch_copilot(cookie_str: str) -> ProviderData:
 
 def fetch_cursor(cookie_str: str) -> ProviderData:
     """Fetch Cursor IDE usage via browser cookies (WorkOS session)."""
-    cookies = parse_cookie_string(cookie_str)
+    cookies = _request_cookies(cookie_str)
     try:
-        r = requests.get(
+        r = _session().get(
             "https://cursor.com/api/usage-summary",
-            cookies=_strip_cf_cookies(cookies),
+            cookies=cookies,
             headers={
                 "Accept": "application/json",
                 "Referer": "https://cursor.com/dashboard?tab=usage",
             },
             timeout=10,
-            impersonate=_IMPERSONATE,
         )
         r.raise_for_status()
         data = r.json()
-        log.debug("cursor usage-summary: %s", json.dumps(data, indent=2))
+        log.debug("cursor usage-summary: %s", _LazyJSON(data))
         plan = (data.get("individualUsage") or {}).get("plan") or {}
         auto_pct = int(round(float(plan.get("autoPercentUsed", 0))))
         api_pct = int(round(float(plan.get("apiPercentUsed", 0))))
         total_pct = int(round(float(plan.get("totalPercentUsed", 0))))
         # Build reset string from billingCycleEnd
-        reset_str = ""
+        reset_str, reset_at = "", None
         cycle_end = data.get("billingCycleEnd")
         if cycle_end:
             try:
-                end_dt = datetime.fromisoformat(cycle_end.replace("Z", "+00:00"))
-                delta = end_dt - datetime.now(timezone.utc)
-                if delta.total_seconds() > 0:
-                    days = delta.days
-                    hours = delta.seconds // 3600
-                    if days > 0:
-                        reset_str = f"resets in {days}d {hours}h"
-                    else:
-                        reset_str = f"resets in {hours}h"
+                reset_at = _parse_iso_utc(cycle_end).timestamp()
+                reset_str = _fmt_cycle_reset(reset_at)
             except (ValueError, TypeError):
                 pass
         rows = [
-            LimitRow(label="Auto", pct=auto_pct, reset_str=reset_str),
-            LimitRow(label="API", pct=api_pct, reset_str=reset_str),
+            LimitRow(label="Auto", pct=auto_pct, reset_str=reset_str, reset_at=reset_at),
+            LimitRow(label="API", pct=api_pct, reset_str=reset_str, reset_at=reset_at),
         ]
         pd = ProviderData("Cursor", spent=float(total_pct), limit=100.0, currency="")
         pd._rows = rows
@@ -891,27 +1319,77 @@ PROVIDER_REGISTRY: dict[str, tuple[str, callable]] = {
     "glm_key":         ("GLM (Zhipu)", fetch_glm),
 }
 
+# Anything cookie-like in pasted text: one scan instead of two `in` checks
+_COOKIE_HINT_RE = re.compile(r"sessionKey|=")
+
 # Cookie-based providers (auto-detected from browser, not manually entered)
 _COOKIE_PROVIDERS = {"chatgpt_cookies", "copilot_cookies", "cursor_cookies"}
 
+# Minimum seconds between fetches per provider: rate-limit windows move
+# within minutes, billing totals much more slowly.
+_PROVIDER_MIN_INTERVAL: dict[str, float] = {
+    "chatgpt_cookies": 120,
+    "copilot_cookies": 120,
+    "cursor_cookies":  120,
+    "openai_key":      600,
+    "minimax_key":     600,
+    "glm_key":         600,
+}
+
 
 # ── time helpers ──────────────────────────────────────────────────────────────
 
 _DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
 
-def _fmt_reset(val) -> str:
+@functools.lru_cache(maxsize=64)
+def _parse_iso_utc(s: str) -> datetime:
+    """Parse an ISO-8601 timestamp into an aware datetime (naive → UTC).
+
+    Memoised: a provider repeats the same resets_at for hours, while
+    _fmt_reset_at's cache turns over every minute.
+
+    Fast path for the 'YYYY-MM-DDTHH:MM:SS[.fff](Z|+00:00)' shape every
+    provider sends: slice fixed positions instead of running the general
+    parser. Sub-second precision is dropped. Anything else falls back to
+    datetime.fromisoformat().
+    """
+    if len(s) >= 19 and s[4] == "-" and s[7] == "-" and s[13] == ":" and s[16] == ":":
+        tz = s[19:]
+        if tz.startswith("."):
+            tz = tz.lstrip(".0123456789")
+        if tz in ("", "Z", "+00:00"):
+            return datetime(
+                int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                int(s[11:13]), int(s[14:16]), int(s[17:19]),
+                tzinfo=timezone.utc,
+            )
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    dt = datetime.fromisoformat(s)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _fmt_reset(val, now: float | None = None) -> str:
     if val is None:
         return ""
+    minute = int((time.time() if now is None else now) // 60)
+    try:
+        return _fmt_reset_at(val, minute)
+    except TypeError:  # unhashable value from an unexpected payload shape
+        return _fmt_reset_at.__wrapped__(val, minute)
+
+
+@functools.lru_cache(maxsize=256)
+def _fmt_reset_at(val, minute: int) -> str:
+    """_fmt_reset() against a minute-truncated clock; the text only has
+    minute resolution, so repeat calls within a minute are cache hits."""
     try:
         if isinstance(val, (int, float)):
             dt = datetime.fromtimestamp(val, tz=timezone.utc)
         else:
-            s = str(val).rstrip("Z")
-            if "+" not in s[10:] and s[-6] != "+":
-                s += "+00:00"
-            dt = datetime.fromisoformat(s)
-        now = datetime.now(timezone.utc)
+            dt = _parse_iso_utc(str(val))
+        now = datetime.fromtimestamp(minute * 60, tz=timezone.utc)
         delta = dt - now
         secs = delta.total_seconds()
         if secs <= 0:
@@ -923,26 +1401,60 @@ def _fmt_reset(val) -> str:
                 return f"resets in {h}h {m}m"
             return f"resets in {m}m"
         day = _DAYS[dt.weekday()]
-        return f"resets {day} {dt.strftime('%H:%M')}"
+        return f"resets {day} {dt.hour:02d}:{dt.minute:02d}"
     except Exception:
         log.debug("_fmt_reset failed for %r", val, exc_info=True)
         return str(val)[:20]
 
 
+def _fmt_cycle_reset(end_ts: float, now: float | None = None) -> str:
+    """Coarse 'resets in 3d 4h' text for a billing-cycle end ('' once past)."""
+    secs = int(end_ts - (time.time() if now is None else now))
+    if secs <= 0:
+        return ""
+    days, hours = secs // 86400, secs % 86400 // 3600
+    return f"resets in {days}d {hours}h" if days > 0 else f"resets in {hours}h"
+
+
+# Re-renders a cached provider's LimitRow.reset_str; default _fmt_reset
+_PROVIDER_RESET_FMT = {"cursor_cookies": _fmt_cycle_reset}
+
+
+def _rerender_resets(pd: ProviderData, fmt, now: float) -> ProviderData | None:
+    """Copy of a cached ProviderData with reset texts re-rendered for now.
+
+    None once any row's reset time has passed: its pct is stale too, so
+    the caller fetches again instead of reusing it.
+    """
+    rows = pd._rows
+    if not rows or all(r.reset_at is None for r in rows):
+        return pd
+    if any(r.reset_at is not None and r.reset_at <= now for r in rows):
+        return None
+    # New objects, not in-place edits: the menu signature holds the old ones
+    return replace(pd, _rows=[
+        r if r.reset_at is None else replace(r, reset_str=fmt(r.reset_at, now))
+        for r in rows
+    ])
+
+
 # ── parser ────────────────────────────────────────────────────────────────────
 
-def _row(data: dict, key: str, label: str) -> LimitRow | None:
+def _row(data: dict, key: str, label: str, now: float | None = None) -> LimitRow | None:
     bucket = data.get(key)
     if not bucket or not isinstance(bucket, dict):
         return None
-    raw = float(bucket.get("utilization", 0))
+    raw = bucket.get("utilization", 0)
     # API returns 0-100 percentage for all fields (five_hour, seven_day, etc.)
-    pct = min(100, round(raw))
-    reset = _fmt_reset(bucket.get("resets_at"))
+    if type(raw) is not int:  # ints (the common case) need no coercion
+        raw = round(float(raw))
+    pct = 100 if raw > 100 else raw
+    resets_at = bucket.get("resets_at")
+    reset = _fmt_reset(resets_at, now) if resets_at is not None else ""
     return LimitRow(label, pct, reset)
 
 
-def parse_usage(raw: dict) -> UsageData:
+def parse_usage(raw: dict, now: float | None = None) -> UsageData:
     """
     API response shape (confirmed):
       five_hour        → Plan usage limits / Current session
@@ -955,9 +1467,9 @@ def parse_usage(raw: dict) -> UsageData:
     overages = bool(extra) if extra is not None else None
 
     return UsageData(
-        session=_row(u, "five_hour", "Current Session"),
-        weekly_all=_row(u, "seven_day", "All Models"),
-        weekly_sonnet=_row(u, "seven_day_sonnet", "Sonnet Only"),
+        session=_row(u, "five_hour", "Current Session", now),
+        weekly_all=_row(u, "seven_day", "All Models", now),
+        weekly_sonnet=_row(u, "seven_day_sonnet", "Sonnet Only", now),
         overages_enabled=overages,
         raw=raw,
     )
@@ -968,11 +1480,32 @@ def parse_usage(raw: dict) -> UsageData:
 _ICON_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 _ICON_SIZE  = 14   # points — matches menu bar font height
 _icon_cache: dict = {}
+_icon_raw_cache: dict = {}
+
+
+def _icon_raw(filename: str):
+    """Decoded, untinted NSImage for an asset, loaded from disk once.
+
+    Shared by every size/tint derived from it — callers must copy() before
+    mutating (setSize_, setTemplate_).
+    """
+    if filename in _icon_raw_cache:
+        return _icon_raw_cache[filename]
+    raw = None
+    try:
+        from AppKit import NSImage
+        raw = NSImage.alloc().initWithContentsOfFile_(os.path.join(_ICON_DIR, filename))
+    except Exception as e:
+        log.debug("_icon_raw %s: %s", filename, e)
+    _icon_raw_cache[filename] = raw
+    return raw
 
 
 def _bar_icon(filename: str, tint_hex: str | None = None):
     """Lazy-load and cache a menu bar icon (14×14 pt NSImage).
 
+    Untinted results are the shared _icon_raw() image — never mutate them.
+
     tint_hex: e.g. '#74AA9C' — applied to monochrome (black) icons so they
               show in the brand color. Pass None for already-coloured icons.
     """
@@ -981,17 +1514,16 @@ def _bar_icon(filename: str, tint_hex: str | None = None):
         return _icon_cache[key]
     img = None
     try:
-        from AppKit import NSImage, NSColor
-        path = os.path.join(_ICON_DIR, filename)
-        raw = NSImage.alloc().initWithContentsOfFile_(path)
-        if raw:
+        raw = _icon_raw(filename)
+        if raw and not tint_hex:
+            # Untinted: share the decoded image as-is; _icon_astr's
+            # attachment bounds already draw it at _ICON_SIZE.
+            img = raw
+        elif raw:
             img = raw.copy()
             img.setSize_((_ICON_SIZE, _ICON_SIZE))
             if tint_hex:
-                r = int(tint_hex[1:3], 16) / 255
-                g = int(tint_hex[3:5], 16) / 255
-                b = int(tint_hex[5:7], 16) / 255
-                color = NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, 1.0)
+                color = _srgb_color(tint_hex)
                 img.setTemplate_(True)
                 if hasattr(img, "imageWithTintColor_"):
                     img = img.imageWithTintColor_(color)
@@ -1015,6 +1547,25 @@ def _icon_astr(img, base_attrs: dict):
     return m
 
 
+_icon_astr_cache: dict[tuple[str, str | None], object] = {}
+
+
+def _bar_icon_astr(filename: str, tint_hex: str | None, base_attrs: dict):
+    """Cached _icon_astr(_bar_icon(...)) for the status bar title.
+
+    base_attrs is the menu bar font, constant for the session. The result
+    is only ever appended (copied) into the title, never mutated.
+    """
+    key = (filename, tint_hex)
+    astr = _icon_astr_cache.get(key)
+    if astr is None:
+        img = _bar_icon(filename, tint_hex=tint_hex)
+        if not img:
+            return None
+        astr = _icon_astr_cache[key] = _icon_astr(img, base_attrs)
+    return astr
+
+
 # ── Sticky toggle view (menu stays open on click) ────────────────────────────
 
 _HAS_TOGGLE_VIEW = False
@@ -1072,40 +1623,126 @@ except Exception:
 CC_STATS_FILE = os.path.expanduser("~/.claude/stats-cache.json")
 
 
-def fetch_claude_code_stats() -> dict | None:
+def fetch_claude_code_stats(now: float | None = None) -> dict | None:
     """Read Claude Code usage from ~/.claude/stats-cache.json (no network needed).
 
     Returns dict with today_messages, today_sessions, week_messages,
     week_sessions, week_tool_calls — or None if the file doesn't exist.
+    The result is reused until the file's mtime/size or the date changes.
     """
-    if not os.path.exists(CC_STATS_FILE):
+    try:
+        st = os.stat(CC_STATS_FILE)
+    except OSError:
         return None
     try:
+        local_now = datetime.now() if now is None else datetime.fromtimestamp(now)
+        today = local_now.strftime("%Y-%m-%d")
+        cache_key = (st.st_mtime_ns, st.st_size, today)
+        cached = getattr(fetch_claude_code_stats, "_cache", None)
+        if cached and cached[0] == cache_key:
+            return cached[1]
         with open(CC_STATS_FILE) as f:
             data = json.load(f)
-        today = datetime.now().strftime("%Y-%m-%d")
-        week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-        entries = data.get("dailyActivity", [])
-        today_e = next((e for e in entries if e["date"] == today), None)
-        week_e  = [e for e in entries if e["date"] >= week_ago]
-        return {
-            "today_messages":   today_e["messageCount"]  if today_e else 0,
-            "today_sessions":   today_e["sessionCount"]  if today_e else 0,
-            "week_messages":    sum(e["messageCount"]  for e in week_e),
-            "week_sessions":    sum(e["sessionCount"]  for e in week_e),
-            "week_tool_calls":  sum(e["toolCallCount"] for e in week_e),
-            "last_date": max((e["date"] for e in entries), default=None),
+        week_ago = (local_now - timedelta(days=7)).strftime("%Y-%m-%d")
+        today_msg = today_ses = wk_msg = wk_ses = wk_tools = 0
+        seen_today = False
+        last_date = None
+        # Single pass over the (possibly months-long) activity log
+        for e in data.get("dailyActivity", []):
+            d = e.get("date")
+            if not d:
+                continue
+            if last_date is None or d > last_date:
+                last_date = d
+            if d < week_ago:
+                continue
+            msg = e.get("messageCount", 0)
+            ses = e.get("sessionCount", 0)
+            wk_msg += msg
+            wk_ses += ses
+            wk_tools += e.get("toolCallCount", 0)
+            if d == today and not seen_today:
+                today_msg, today_ses, seen_today = msg, ses, True
+        result = {
+            "today_messages":   today_msg,
+            "today_sessions":   today_ses,
+            "week_messages":    wk_msg,
+            "week_sessions":    wk_ses,
+            "week_tool_calls":  wk_tools,
+            "last_date": last_date,
         }
+        fetch_claude_code_stats._cache = (cache_key, result)
+        return result
     except Exception as e:
         log.debug("fetch_claude_code_stats failed: %s", e)
         return None
 
 
+def _compact(obj):
+    """Recursively drop None-valued keys from a widget payload.
+
+    Every field the widget can see as null is an Optional in its Codable
+    structs (UsageData.swift), which decode a missing key as nil.
+    Containers are kept even when they end up empty.
+    """
+    if isinstance(obj, dict):
+        return {k: _compact(v) for k, v in obj.items() if v is not None}
+    if isinstance(obj, list):
+        return [_compact(v) for v in obj]
+    return obj
+
+
+def _widget_row_dict(row: LimitRow | None) -> dict | None:
+    if row is None:
+        return None
+    return {"label": row.label, "pct": row.pct, "reset_str": row.reset_str}
+
+
+def _widget_rows(pd: ProviderData | None) -> tuple[list | None, str | None]:
+    """(rows, error) for a row-based provider's widget block."""
+    if not pd:
+        return None, None
+    if pd.error:
+        return None, pd.error
+    return [_widget_row_dict(r) for r in pd._rows or []], None
+
+
+def _widget_copilot(pd: ProviderData | None) -> dict:
+    if not pd:
+        return {"spent": None, "limit": None, "pct": None, "error": None}
+    if pd.error:
+        return {"spent": None, "limit": None, "pct": None, "error": pd.error}
+    pct = int(round(pd.spent / pd.limit * 100)) if pd.limit else 0
+    return {"spent": pd.spent, "limit": pd.limit, "pct": pct, "error": None}
+
+
+@functools.lru_cache(maxsize=16)
+def _widget_active_providers(
+    claude: bool, chatgpt: bool, copilot: bool, cursor: bool
+) -> tuple[str, ...]:
+    """Provider IDs the user has configured (always at least Claude)."""
+    active = tuple(
+        prov_id for prov_id, on in (
+            ("claude", claude), ("chatgpt", chatgpt),
+            ("copilot", copilot), ("cursor", cursor),
+        ) if on
+    )
+    return active or ("claude",)
+
+
+def _widget_bar_providers(chosen: list | None) -> list[str] | None:
+    """User's explicit bar provider choices (lowercase IDs), or None for auto."""
+    if not chosen:
+        return None
+    return [n.lower() for n in chosen]
+
+
 def _write_widget_cache(
     data: UsageData,
     providers: list[ProviderData],
     cc_stats: dict | None,
     config: dict | None = None,
+    now: float | None = None,
 ) -> None:
     """Write current usage snapshot for the WidgetKit widget.
 
@@ -1114,77 +1751,17 @@ def _write_widget_cache(
     Failures are logged but never crash the main app.
     """
     try:
-        def _row_dict(row: LimitRow | None) -> dict | None:
-            if row is None:
-                return None
-            return {"label": row.label, "pct": row.pct, "reset_str": row.reset_str}
-
-        def _active_providers(cfg: dict) -> list[str]:
-            """Return list of provider IDs the user has configured."""
-            active = []
-            if cfg.get("cookie_str"):
-                active.append("claude")
-            _key_map = {
-                "chatgpt_cookies": "chatgpt",
-                "copilot_cookies": "copilot",
-                "cursor_cookies":  "cursor",
-            }
-            for cfg_key, prov_id in _key_map.items():
-                if cfg.get(cfg_key):
-                    active.append(prov_id)
-            # Fallback: always show at least Claude
-            return active or ["claude"]
-
-        def _bar_providers(cfg: dict) -> list[str] | None:
-            """User's explicit bar provider choices (lowercase IDs), or None for auto."""
-            chosen = cfg.get("bar_providers")
-            if not chosen:
-                return None
-            return [n.lower() for n in chosen]
-
-        def _copilot_block(provs: list[ProviderData]) -> dict:
-            pd = next((p for p in provs if p.name == "Copilot"), None)
-            if not pd:
-                return {"spent": None, "limit": None, "pct": None, "error": None}
-            if pd.error:
-                return {"spent": None, "limit": None, "pct": None, "error": pd.error}
-            pct = int(round(pd.spent / pd.limit * 100)) if pd.limit else 0
-            return {
-                "spent": pd.spent,
-                "limit": pd.limit,
-                "pct": pct,
-                "error": None,
-            }
-
-        # ChatGPT rows
-        chatgpt_pd = next((p for p in providers if p.name == "ChatGPT"), None)
-        chatgpt_rows = None
-        chatgpt_error = None
-        if chatgpt_pd:
-            if chatgpt_pd.error:
-                chatgpt_error = chatgpt_pd.error
-            else:
-                raw_rows = getattr(chatgpt_pd, "_rows", None) or []
-                chatgpt_rows = [_row_dict(r) for r in raw_rows]
-
-        # Cursor rows
-        cursor_pd = next((p for p in providers if p.name == "Cursor"), None)
-        cursor_rows = None
-        cursor_error = None
-        if cursor_pd:
-            if cursor_pd.error:
-                cursor_error = cursor_pd.error
-            else:
-                raw_rows = getattr(cursor_pd, "_rows", None) or []
-                cursor_rows = [_row_dict(r) for r in raw_rows]
+        by_name = {p.name: p for p in providers}
+        cfg = config or {}
+        chatgpt_rows, chatgpt_error = _widget_rows(by_name.get("ChatGPT"))
+        cursor_rows, cursor_error = _widget_rows(by_name.get("Cursor"))
 
         payload = {
             "version": 1,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
             "claude": {
-                "session": _row_dict(data.session),
-                "weekly_all": _row_dict(data.weekly_all),
-                "weekly_sonnet": _row_dict(data.weekly_sonnet),
+                "session": _widget_row_dict(data.session),
+                "weekly_all": _widget_row_dict(data.weekly_all),
+                "weekly_sonnet": _widget_row_dict(data.weekly_sonnet),
                 "overages_enabled": data.overages_enabled,
             },
             "chatgpt": {
@@ -1195,36 +1772,160 @@ def _write_widget_cache(
                 "rows": cursor_rows,
                 "error": cursor_error,
             },
-            "copilot": _copilot_block(providers),
+            "copilot": _widget_copilot(by_name.get("Copilot")),
             "claude_code": {
                 "today_messages": (cc_stats or {}).get("today_messages", 0),
                 "week_messages": (cc_stats or {}).get("week_messages", 0),
             },
-            "active_providers": _active_providers(config or {}),
-            "bar_providers": _bar_providers(config or {}),
+            "active_providers": list(_widget_active_providers(
+                bool(cfg.get("cookie_str")),
+                bool(cfg.get("chatgpt_cookies")),
+                bool(cfg.get("copilot_cookies")),
+                bool(cfg.get("cursor_cookies")),
+            )),
+            "bar_providers": _widget_bar_providers(cfg.get("bar_providers")),
         }
+        payload = _compact(payload)
+
+        # Skip the write + widget reload when nothing changed, but still
+        # refresh updated_at periodically so the widget doesn't mark the
+        # data stale (it does so after 30 min).
+        digest = hashlib.blake2b(
+            json.dumps(payload, separators=(",", ":")).encode(), digest_size=16
+        ).digest()
+        mono = time.monotonic()
+        last = getattr(_write_widget_cache, "_last", None)
+        if last and last[0] == digest and mono - last[1] < _WIDGET_HEARTBEAT:
+            return
+        updated = datetime.now(timezone.utc) if now is None else \
+            datetime.fromtimestamp(now, tz=timezone.utc)
+        payload = {"updated_at": updated.isoformat(), **payload}
 
+        blob = json.dumps(payload, separators=(",", ":")).encode()
         os.makedirs(WIDGET_CACHE_DIR, exist_ok=True)
         tmp = os.path.join(WIDGET_CACHE_DIR, ".usage.json.tmp")
-        with open(tmp, "w") as f:
-            json.dump(payload, f, indent=2)
+        with open(tmp, "wb") as f:
+            f.write(blob)
         os.replace(tmp, WIDGET_CACHE_FILE)
         log.debug("widget cache written: %s", WIDGET_CACHE_FILE)
 
-        # Nudge WidgetKit to reload (non-blocking, best-effort)
-        subprocess.Popen(
+        _schedule_widget_reload()
+        _write_widget_cache._last = (digest, mono)
+    except Exception:
+        log.debug("_write_widget_cache failed", exc_info=True)
+
+
+# Single-slot hand-off to the widget writer thread: only the newest
+# snapshot is ever waiting, older ones are dropped unwritten.
+_widget_queue: queue.Queue = queue.Queue(maxsize=1)
+_widget_writer_lock = threading.Lock()
+
+
+def _widget_writer_loop():
+    while True:
+        _write_widget_cache(*_widget_queue.get())
+
+
+def _queue_widget_cache(
+    data: UsageData,
+    providers: list[ProviderData],
+    cc_stats: dict | None,
+    config: dict | None = None,
+    now: float | None = None,
+) -> None:
+    """_write_widget_cache() on the widget writer thread, off the caller's."""
+    with _widget_writer_lock:
+        if getattr(_queue_widget_cache, "_thread", None) is None:
+            t = threading.Thread(target=_widget_writer_loop,
+                                 name="widget-writer", daemon=True)
+            t.start()
+            _queue_widget_cache._thread = t
+        # config is shared with the main thread; hand over a snapshot
+        item = (data, providers, cc_stats, dict(config or {}), now)
+        while True:
+            try:
+                _widget_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    _widget_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+_widget_reload_timer: threading.Timer | None = None
+_widget_reload_lock = threading.Lock()
+
+
+def _reload_widget():
+    """Ask the host app to reload WidgetKit timelines (best-effort)."""
+    try:
+        subprocess.run(
             ["open", "-g", "-a", "AIQuotaBarHost", "--args", "--reload-widget"],
-            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10,
         )
     except Exception:
-        log.debug("_write_widget_cache failed", exc_info=True)
+        log.debug("widget reload nudge failed", exc_info=True)
+
+
+def _schedule_widget_reload(delay: float = 0.5):
+    """Debounced _reload_widget(): a burst of cache writes sends one nudge,
+    and the spawn happens on the timer thread, not the caller's."""
+    global _widget_reload_timer
+    with _widget_reload_lock:
+        if _widget_reload_timer is not None:
+            _widget_reload_timer.cancel()
+        _widget_reload_timer = threading.Timer(delay, _reload_widget)
+        _widget_reload_timer.daemon = True
+        _widget_reload_timer.start()
+
 
+_STATE_TTL = 60.0  # seconds a memoized filesystem state check stays valid
 
+
+def _ttl_memo(fn):
+    """Memoize a no-arg state check for _STATE_TTL seconds.
+
+    fn.invalidate() drops the cached value after we change the state ourselves.
+    """
+    cache: list = []   # [(value, monotonic_ts)]
+
+    @functools.wraps(fn)
+    def wrapper():
+        mono = time.monotonic()
+        if cache and mono - cache[0][1] < _STATE_TTL:
+            return cache[0][0]
+        value = fn()
+        cache[:] = [(value, mono)]
+        return value
+    wrapper.invalidate = cache.clear
+    return wrapper
+
+
+@_ttl_memo
 def _is_widget_installed() -> bool:
     """Check if the AIQuotaBarHost widget app is installed."""
     return os.path.isdir(WIDGET_HOST_APP)
 
 
+def _gif_size(path: str) -> tuple[int, int] | None:
+    """Pixel (width, height) of an image from its header, without decoding frames."""
+    try:
+        import Quartz
+        from Foundation import NSURL
+        src = Quartz.CGImageSourceCreateWithURL(NSURL.fileURLWithPath_(path), None)
+        if src is None:
+            return None
+        props = Quartz.CGImageSourceCopyPropertiesAtIndex(src, 0, None)
+        if not props:
+            return None
+        return (int(props[Quartz.kCGImagePropertyPixelWidth]),
+                int(props[Quartz.kCGImagePropertyPixelHeight]))
+    except Exception as e:
+        log.debug("_gif_size(%s) failed: %s", path, e)
+        return None
+
+
 def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
     """Show a native macOS welcome window with side-by-side GIFs."""
     from AppKit import (
@@ -1241,24 +1942,24 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
     PAD = 24
     GAP = 16
 
-    # Load both GIFs
+    # Only the GIF headers are read here (for layout); the frames are
+    # decoded on a background thread once the window is already up.
     assets_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
-    demo_img = NSImage.alloc().initWithContentsOfFile_(
-        os.path.join(assets_dir, "demo.gif")
-    )
-    widget_img = NSImage.alloc().initWithContentsOfFile_(gif_path)
+    demo_path = os.path.join(assets_dir, "demo.gif")
+    demo_size = _gif_size(demo_path)
+    widget_size = _gif_size(gif_path)
 
     # Both GIFs at same height; widths from aspect ratios
     GIF_H = 480
-    def _w_for_h(img, h):
-        if not img:
+    def _w_for_h(size, h):
+        if not size:
             return 200
-        iw, ih = img.size().width, img.size().height
+        iw, ih = size
         return int(h * iw / ih) if ih > 0 else 200
 
     # Left GIF: fixed wider width, fill-scaled (crops top/bottom)
     demo_w = 320
-    widget_w = _w_for_h(widget_img, GIF_H)
+    widget_w = _w_for_h(widget_size, GIF_H)
     WIN_W = PAD + demo_w + GAP + widget_w + PAD
     WIN_H = 70 + GIF_H + 20 + 150 + 54  # header + gifs + labels + info + button
 
@@ -1293,7 +1994,7 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
 
     border_color = Quartz.CGColorCreateGenericRGB(1, 1, 1, 0.08)
 
-    def _make_gif(img, x, y, w, h, fill=False):
+    def _make_gif(size, x, y, w, h, fill=False):
         c = NSView.alloc().initWithFrame_(NSMakeRect(x, y, w, h))
         c.setWantsLayer_(True)
         c.layer().setCornerRadius_(10)
@@ -1301,10 +2002,10 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
         c.layer().setBorderWidth_(0.5)
         c.layer().setBorderColor_(border_color)
         content.addSubview_(c)
-        if img:
+        if size:
             if fill:
                 # Scale to fill: size image view to cover container, clip overflow
-                iw, ih = img.size().width, img.size().height
+                iw, ih = size
                 ratio = iw / ih if ih > 0 else 1.0
                 # Scale by width → compute height needed
                 iv_w = w
@@ -1314,7 +2015,6 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
                     NSMakeRect(0, iv_y, iv_w, iv_h))
             else:
                 iv = NSImageView.alloc().initWithFrame_(NSMakeRect(0, 0, w, h))
-            iv.setImage_(img)
             iv.setAnimates_(True)
             iv.setImageScaling_(3)
             iv.setImageAlignment_(0)
@@ -1324,6 +2024,8 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
             iv.layer().setShouldRasterize_(True)
             iv.layer().setRasterizationScale_(3.0)
             c.addSubview_(iv)
+            return iv
+        return None
 
     def _label(text, x, y, w, align=NSTextAlignmentCenter, size=11, weight=0.3):
         lbl = NSTextField.alloc().initWithFrame_(NSMakeRect(x, y, w, 14))
@@ -1356,11 +2058,11 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
 
     # ── Side-by-side GIFs ──
     gif_y = y_top - 22 - 14 - GIF_H
-    _make_gif(demo_img, PAD, gif_y, demo_w, GIF_H, fill=True)
+    demo_iv = _make_gif(demo_size, PAD, gif_y, demo_w, GIF_H, fill=True)
     _label("Menu Bar", PAD, gif_y - 16, demo_w)
 
     widget_x = PAD + demo_w + GAP
-    _make_gif(widget_img, widget_x, gif_y, widget_w, GIF_H)
+    widget_iv = _make_gif(widget_size, widget_x, gif_y, widget_w, GIF_H)
     _label("Desktop Widget", widget_x, gif_y - 16, widget_w)
 
     # ── Info rows ──
@@ -1420,32 +2122,114 @@ def _show_welcome_window(gif_path: str, widget_installed: bool) -> None:
     NSApplication.sharedApplication().activateIgnoringOtherApps_(True)
     _show_welcome_window._active_win = win
 
+    def _load_gifs():
+        for iv, path in ((demo_iv, demo_path), (widget_iv, gif_path)):
+            if iv is None:
+                continue
+            img = NSImage.alloc().initWithContentsOfFile_(path)
+            if img:
+                iv.performSelectorOnMainThread_withObject_waitUntilDone_(
+                    b"setImage:", img, False)
+
+    threading.Thread(target=_load_gifs, daemon=True).start()
 
-def _ensure_history_handler():
-    """Lazily create an ObjC click handler for heatmap cells."""
-    h = getattr(_ensure_history_handler, '_inst', None)
-    if h is not None:
-        return h
-    try:
-        from AppKit import NSObject
-
-        class _HMapHandler(NSObject):
-            def cellClicked_(self, sender):
-                fn = getattr(type(self), '_on_click', None)
-                if fn:
-                    fn(sender.tag())
-        _ensure_history_handler._inst = _HMapHandler.alloc().init()
-    except Exception:
-        log.debug("Failed to create history click handler", exc_info=True)
-        _ensure_history_handler._inst = None
-    return _ensure_history_handler._inst
+
+def _heatmap_view(frame, cells: dict, tips: list, cell: float, step: float,
+                  corner: float = 3):
+    """One NSView that draws, hit-tests and tooltips every heatmap cell.
+
+    ``cells`` maps CGColor -> list of (x, y, w, h) rects in the view's own
+    coordinates; each colour is filled with one CGContextFillPath.
+    Day ``i`` sits at column i // 7, row i % 7 (rows counted from the top),
+    so clicks and hovers map back to an index arithmetically. Set the
+    view's ``_on_click`` to a callable taking that index.
+    """
+    cls = getattr(_heatmap_view, "_cls", None)
+    if cls is None:
+        import objc
+        from AppKit import (
+            NSView, NSGraphicsContext, NSTrackingArea, NSTrackingMouseMoved,
+            NSTrackingActiveAlways, NSTrackingInVisibleRect,
+        )
+        import Quartz
+
+        class _HeatmapView(NSView):
+            def drawRect_(self, _rect):
+                ctx = NSGraphicsContext.currentContext().CGContext()
+                r = self._corner
+                for color, rects in self._cells.items():
+                    Quartz.CGContextSetFillColorWithColor(ctx, color)
+                    for rect in rects:
+                        Quartz.CGContextAddPath(
+                            ctx, Quartz.CGPathCreateWithRoundedRect(rect, r, r, None))
+                    Quartz.CGContextFillPath(ctx)
+
+            @objc.python_method
+            def _index_at(self, event):
+                p = self.convertPoint_fromView_(event.locationInWindow(), None)
+                col, dx = divmod(p.x, self._step)
+                row, dy = divmod(self.bounds().size.height - p.y, self._step)
+                if dx >= self._cell or dy >= self._cell or not 0 <= row < 7:
+                    return None
+                i = int(col) * 7 + int(row)
+                return i if 0 <= i < len(self._tips) else None
+
+            def mouseDown_(self, event):
+                i = self._index_at(event)
+                fn = self._on_click
+                if i is not None and fn:
+                    fn(i)
+
+            def mouseMoved_(self, event):
+                i = self._index_at(event)
+                tip = self._tips[i] if i is not None else None
+                if tip != self._tip:
+                    self._tip = tip
+                    self.setToolTip_(tip)
+
+        cls = _heatmap_view._cls = _HeatmapView
+        cls._tracking_opts = (NSTrackingMouseMoved | NSTrackingActiveAlways
+                              | NSTrackingInVisibleRect)
+        cls._tracking_cls = NSTrackingArea
+    v = cls.alloc().initWithFrame_(frame)
+    v._cells, v._tips = cells, tips
+    v._cell, v._step, v._corner = cell, step, corner
+    v._on_click = v._tip = None
+    v.addTrackingArea_(cls._tracking_cls.alloc().initWithRect_options_owner_userInfo_(
+        v.bounds(), cls._tracking_opts, v, None))
+    return v
+
+
+@functools.lru_cache(maxsize=64)
+def _text_width(text: str, size: float, weight: float = 0.0) -> float:
+    """Rendered width of text in the system font (points)."""
+    from AppKit import NSFont, NSFontAttributeName
+    from Foundation import NSString
+    font = NSFont.systemFontOfSize_weight_(size, weight)
+    return NSString.stringWithString_(text).sizeWithAttributes_(
+        {NSFontAttributeName: font}).width
+
+
+_HEAT_LEVELS = 20  # 5% colour steps; the legend's 0/25/50/75/100 land exactly
+
+
+def _heat_cgcolor(pct: int):
+    """Heatmap cell colour for a 0–100 pct, quantised to _HEAT_LEVELS steps."""
+    return _heat_level_cgcolor(min(max(pct, 0), 100) * _HEAT_LEVELS // 100)
+
+
+@functools.lru_cache(maxsize=_HEAT_LEVELS + 1)
+def _heat_level_cgcolor(level: int):
+    import Quartz
+    t = level / _HEAT_LEVELS
+    return Quartz.CGColorCreateGenericRGB(0.14 + t * 0.71, 0.14 + t * 0.33, 0.20 + t * 0.14, 1.0)
 
 
 def _show_history_window(conn: sqlite3.Connection) -> None:
     """Show a native macOS Usage History window with heatmap, stats, and charts."""
     from AppKit import (
         NSWindow, NSTextField, NSFont, NSColor, NSView, NSScrollView,
-        NSButton, NSMakeRect, NSWindowStyleMaskTitled, NSWindowStyleMaskClosable,
+        NSMakeRect, NSWindowStyleMaskTitled, NSWindowStyleMaskClosable,
         NSWindowStyleMaskFullSizeContentView, NSBackingStoreBuffered,
         NSTextAlignmentCenter, NSTextAlignmentLeft,
         NSApplication, NSFloatingWindowLevel, NSScreen,
@@ -1476,25 +2260,20 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
     days = data["days"]
     per_day_detail = data.get("per_day_detail", {})
     today_windows = data.get("today_windows", {})
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = datetime.now(timezone.utc).date()
+    today_str = today.isoformat()
     # Only show providers that have actual usage data
     providers = [p for p in data["providers"] if p["peak"] > 0]
 
     # ── Helpers ──────────────────────────────────────────────────────────
 
-    def _cg(hex_str, alpha=1.0):
-        h = hex_str.lstrip("#")
-        r, g, b = int(h[0:2], 16) / 255, int(h[2:4], 16) / 255, int(h[4:6], 16) / 255
-        return Quartz.CGColorCreateGenericRGB(r, g, b, alpha)
-
-    dark_bg = _cg("#1C1C2A")
-    card_bg = _cg("#232336")
-    track_bg = _cg("#1C1C2A")
+    dark_bg = _cgcolor("#1C1C2A")
+    card_bg = _cgcolor("#232336")
+    track_bg = _cgcolor("#1C1C2A")
     dim = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.55, 0.55, 0.6, 1.0)
     dimmer = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.4, 0.4, 0.45, 1.0)
 
     # ── Precompute heatmap cell sizing (needed for doc_h) ────────────────
-    today = datetime.now(timezone.utc).date()
     _hm_start = today - timedelta(days=89)
     _hm_start -= timedelta(days=_hm_start.weekday())
     _hm_num_days = (today - _hm_start).days + 1
@@ -1530,6 +2309,16 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
     # Placement helpers: top_y is logical offset from top, converted to
     # NSView bottom-up coordinates via  real_y = parent_h - top_y - h
 
+    # doc is filled while detached from the window and its direct children
+    # are attached with one setSubviews_ at the end.
+    doc_views = []
+
+    def _add(parent, v):
+        if parent is doc:
+            doc_views.append(v)
+        else:
+            parent.addSubview_(v)
+
     def _v(parent, x, top_y, w, h, bg=None, corner=0, ph=None, tooltip=None):
         real_y = (ph or doc_h) - top_y - h
         v = NSView.alloc().initWithFrame_(NSMakeRect(x, real_y, w, h))
@@ -1541,7 +2330,7 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
             v.layer().setMasksToBounds_(True)
         if tooltip:
             v.setToolTip_(tooltip)
-        parent.addSubview_(v)
+        _add(parent, v)
         return v
 
     def _lbl(parent, text, x, top_y, w, h=0, size=12, weight=0.0,
@@ -1561,7 +2350,7 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
         else:
             lbl.setFont_(NSFont.systemFontOfSize_weight_(size, weight))
         lbl.setTextColor_(color or NSColor.labelColor())
-        parent.addSubview_(lbl)
+        _add(parent, lbl)
         return lbl
 
     # ── Build window ─────────────────────────────────────────────────────
@@ -1600,7 +2389,6 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
     content.addSubview_(scroll)
 
     doc = NSView.alloc().initWithFrame_(NSMakeRect(0, 0, WIN_W, doc_h))
-    scroll.setDocumentView_(doc)
 
     # ── Layout (top-down y cursor) ───────────────────────────────────────
     y = PAD + 16
@@ -1623,114 +2411,76 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
             _lbl(doc, dl, PAD, hm_top + row * HSTEP + 1, DAY_LABEL_W - 4,
                  size=9, color=dimmer)
 
-    # Cells (interactive NSButtons for click-to-inspect)
-    handler = _ensure_history_handler()
-    date_for_tag = {}  # tag -> date_str
-    tag_counter = [0]
-
-    current = start
-    col = 0
+    # Cells: one view draws them all and maps clicks/hovers to a day index
+    day_dates = []  # day index -> date_str
+    tips = []          # day index -> tooltip
+    grid_h = 7 * HSTEP
+    grid_y = doc_h - hm_top - grid_h
+    cells: dict = {}  # CGColor -> [rect]
+    hm_view = _heatmap_view(
+        NSMakeRect(HLEFT, grid_y, _hm_num_cols * HSTEP, grid_h),
+        cells, tips, CELL, HSTEP)
+    _add(doc, hm_view)
+
+    # start is a Monday and the days are contiguous, so row/col fall out of
+    # the index and the date strings can be formatted without strftime.
     last_month = -1
-    while current <= today:
-        row = current.weekday()
+    for i in range(_hm_num_days):
+        current = start + timedelta(days=i)
+        col, row = divmod(i, 7)
         cx = HLEFT + col * HSTEP
         cy = hm_top + row * HSTEP
 
-        if current.month != last_month and row == 0:
-            _lbl(doc, current.strftime("%b"), cx, hm_top - 14, 40,
+        month = current.month
+        if month != last_month and row == 0:
+            _lbl(doc, _MONTH_ABBR[month], cx, hm_top - 14, 40,
                  size=9, color=dimmer)
-            last_month = current.month
+            last_month = month
 
-        ds = current.strftime("%Y-%m-%d")
+        ds = f"{current.year:04d}-{month:02d}-{current.day:02d}"
         pct = days.get(ds, -1)
         if pct < 0:
             cc = dark_bg
             tip = f"{ds}  \u2013  No data"
         else:
-            t = min(pct / 100, 1.0)
-            r = 0.14 + t * 0.71
-            g = 0.14 + t * 0.33
-            b = 0.20 + t * 0.14
-            cc = Quartz.CGColorCreateGenericRGB(r, g, b, 1.0)
+            cc = _heat_cgcolor(pct)
             tip = f"{ds}  \u2013  Peak {pct}%"
 
-        tag = tag_counter[0]
-        tag_counter[0] += 1
-        date_for_tag[tag] = ds
+        day_dates.append(ds)
+        tips.append(tip)
 
         real_y = doc_h - cy - CELL
-        btn = NSButton.alloc().initWithFrame_(NSMakeRect(cx, real_y, CELL, CELL))
-        btn.setBordered_(False)
-        btn.setTitle_("")
-        btn.setWantsLayer_(True)
-        btn.layer().setBackgroundColor_(cc)
-        btn.layer().setCornerRadius_(3)
-        btn.layer().setMasksToBounds_(True)
-        btn.setToolTip_(tip)
-        if handler:
-            btn.setTarget_(handler)
-            btn.setAction_(b"cellClicked:")
-            btn.setTag_(tag)
-        doc.addSubview_(btn)
-
-        if row == 6:
-            col += 1
-        current += timedelta(days=1)
+        cells.setdefault(cc, []).append(
+            ((cx - HLEFT, real_y - grid_y), (CELL, CELL)))
 
     # Legend
     legend_y = hm_top + 7 * HSTEP + 8
     lx = HLEFT
     _lbl(doc, "Less", lx - 30, legend_y + 1, 28, size=9, color=dimmer)
     for lv in [0, 25, 50, 75, 100]:
-        t = lv / 100
-        lr = 0.14 + t * 0.71
-        lg = 0.14 + t * 0.33
-        lb = 0.20 + t * 0.14
-        _v(doc, lx, legend_y, CELL, CELL,
-           Quartz.CGColorCreateGenericRGB(lr, lg, lb, 1.0), corner=3)
+        _v(doc, lx, legend_y, CELL, CELL, _heat_cgcolor(lv), corner=3)
         lx += HSTEP
     _lbl(doc, "More", lx + 3, legend_y + 1, 30, size=9, color=dimmer)
 
     y = legend_y + CELL + 16
 
     # ── Selected Day info row (updatable on click) ────────────────────
-    _day_names_fmt = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-
-    def _fmt_date_label(ds):
-        try:
-            dt = datetime.strptime(ds, "%Y-%m-%d")
-            return f"{_day_names_fmt[dt.weekday()]} {dt.strftime('%b %d')}"
-        except Exception:
-            return ds
-
-    today_detail = per_day_detail.get(today_str, {})
-    info_parts = []
-    for key, stats in sorted(today_detail.items()):
-        lbl_name = (key.replace("_", " ").title()
-                    .replace("Chatgpt", "ChatGPT").replace("Api", "API"))
-        info_parts.append(f"{lbl_name} {stats['avg_pct']}%")
-    initial_info = (f"{_fmt_date_label(today_str)}  \u2014  "
-                    + "  \u00b7  ".join(info_parts)) if info_parts else "Click a cell to see day details"
+    # Formatted once here so a click is a single dict lookup.
+    day_info_cache = {ds: _format_day_info(ds, detail)
+                      for ds, detail in per_day_detail.items() if detail}
+    initial_info = day_info_cache.get(today_str, "Click a cell to see day details")
 
     info_label = _lbl(doc, initial_info, PAD, y, inner_w, size=11, color=dim)
     y += 24
 
     # Wire click handler to update info label
-    if handler:
-        def _on_click(tag):
-            ds = date_for_tag.get(tag, "")
-            if not ds:
-                return
-            detail = per_day_detail.get(ds, {})
-            parts = []
-            for key, stats in sorted(detail.items()):
-                name = (key.replace("_", " ").title()
-                        .replace("Chatgpt", "ChatGPT").replace("Api", "API"))
-                parts.append(f"{name} {stats['avg_pct']}%")
-            text = f"{_fmt_date_label(ds)}  \u2014  "
-            text += "  \u00b7  ".join(parts) if parts else "No data"
-            info_label.setStringValue_(text)
-        type(handler)._on_click = _on_click
+    def _on_click(i):
+        ds = day_dates[i]
+        info = day_info_cache.get(ds)
+        if info is None:
+            info = _format_day_info(ds, None)
+        info_label.setStringValue_(info)
+    hm_view._on_click = _on_click
 
     # ── Stats Cards ──────────────────────────────────────────────────────
     CARD_GAP = 10
@@ -1745,7 +2495,7 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
         cx = PAD + i * (card_w + CARD_GAP)
         card = _v(doc, cx, y, card_w, CARD_H, card_bg, corner=10)
         # Accent bar
-        _v(card, 0, 8, 3, CARD_H - 16, _cg(clr), corner=1.5, ph=CARD_H)
+        _v(card, 0, 8, 3, CARD_H - 16, _cgcolor(clr), corner=1.5, ph=CARD_H)
         # Value
         _lbl(card, val, 12, 10, card_w - 16, size=17, weight=0.56, mono=True, ph=CARD_H)
         # Label
@@ -1757,7 +2507,11 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
     y += CARD_H + 24
 
     # ── Per-provider sections (only those with data) ─────────────────────
-    _day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    # The last 7 days as (date_str, day name), shared by every provider
+    week = []
+    for i in range(7):
+        day = today - timedelta(days=6 - i)
+        week.append((day.isoformat(), _DAYS[day.weekday()]))
     BLABEL_W = 32
     BPCT_W = 38
 
@@ -1769,11 +2523,11 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
 
     for prov in providers:
         # Colored dot + name
-        _v(doc, PAD, y + 5, 8, 8, _cg(prov["color"]), corner=4)
+        _v(doc, PAD, y + 5, 8, 8, _cgcolor(prov["color"]), corner=4)
         _lbl(doc, prov["label"], PAD + 14, y, 250, size=14, weight=0.5)
         # Metric hint next to name
         hint = _metric_hint.get(prov["key"], "rate limit")
-        _lbl(doc, hint, PAD + 14 + len(prov["label"]) * 9, y + 2, 200,
+        _lbl(doc, hint, PAD + 14 + _text_width(prov["label"], 14, 0.5) + 8, y + 2, 200,
              size=10, color=dimmer)
         y += 22
 
@@ -1785,7 +2539,7 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
         y += 18
 
         bar_area = inner_w - BLABEL_W - BPCT_W - 8
-        accent = _cg(prov["color"])
+        accent = _cgcolor(prov["color"])
 
         # Intraday 5h windows replace the 7-day chart when available
         prov_windows = today_windows.get(prov["key"], {})
@@ -1808,13 +2562,11 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
         else:
             # 7-day bar chart (fallback when no intraday data)
             day_data = {d["date"]: d["peak_pct"] for d in prov["weekly"]}
-            for i in range(7):
-                day = today - timedelta(days=6 - i)
-                ds = day.strftime("%Y-%m-%d")
+            for i, (ds, dname) in enumerate(week):
                 pct = day_data.get(ds, 0)
                 by = y + i * (BAR_H + BAR_GAP)
 
-                _lbl(doc, _day_names[day.weekday()], PAD, by + 1, BLABEL_W,
+                _lbl(doc, dname, PAD, by + 1, BLABEL_W,
                      h=BAR_H, size=10, color=dim)
                 _v(doc, PAD + BLABEL_W, by, bar_area, BAR_H, track_bg, corner=4)
                 if pct > 0:
@@ -1828,12 +2580,19 @@ def _show_history_window(conn: sqlite3.Connection) -> None:
     _lbl(doc, f"Data since {summary['earliest']}  \u00b7  {summary['total_days']} days tracked",
          PAD, y, inner_w, size=10, color=dimmer, align=NSTextAlignmentCenter)
 
+    # Attach the finished tree as a single Core Animation commit
+    Quartz.CATransaction.begin()
+    Quartz.CATransaction.setDisableActions_(True)
+    doc.setSubviews_(doc_views)
+    scroll.setDocumentView_(doc)
+
     # ── Scroll to top ────────────────────────────────────────────────────
     visible_h = scroll.contentSize().height
     if doc_h > visible_h:
         clip = scroll.contentView()
         clip.scrollToPoint_((0, doc_h - visible_h))
         scroll.reflectScrolledClipView_(clip)
+    Quartz.CATransaction.commit()
 
     win.makeKeyAndOrderFront_(None)
     NSApplication.sharedApplication().activateIgnoringOtherApps_(True)
@@ -1873,8 +2632,8 @@ def _provider_lines(pd: ProviderData) -> list[str]:
     sym = "¥" if pd.currency == "CNY" else ("" if pd.currency == "" else "$")
     if pd.error:
         return [f"  ⚠️  {pd.error[:60]}"]
-    # ChatGPT multi-row format (stored in pd._rows by _parse_wham_usage)
-    rows = getattr(pd, "_rows", None)
+    # Multi-row format (ChatGPT/Cursor set pd._rows)
+    rows = pd._rows
     if rows:
         lines = []
         for row in rows:
@@ -1909,12 +2668,9 @@ def _colored_mi(title: str, color_hex: str) -> rumps.MenuItem:
     item.set_callback(None)
     item._menuitem.setEnabled_(True)
     try:
-        from AppKit import NSColor, NSForegroundColorAttributeName
+        from AppKit import NSForegroundColorAttributeName
         from Foundation import NSAttributedString
-        r = int(color_hex[1:3], 16) / 255
-        g = int(color_hex[3:5], 16) / 255
-        b = int(color_hex[5:7], 16) / 255
-        color = NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, 0.75)
+        color = _srgb_color(color_hex, 0.75)
         astr = NSAttributedString.alloc().initWithString_attributes_(
             title, {NSForegroundColorAttributeName: color}
         )
@@ -1924,21 +2680,21 @@ def _colored_mi(title: str, color_hex: str) -> rumps.MenuItem:
     return item
 
 
+@functools.lru_cache(maxsize=32)
 def _menu_icon(filename: str, tint_hex: str | None = None, size: int = 16):
-    """Load an NSImage for use in a menu item, optionally tinted."""
+    """Load an NSImage for use in a menu item, optionally tinted.
+
+    Cached per (filename, tint, size) and shared across menu rebuilds —
+    callers only hand it to setImage_ and must not mutate it.
+    """
     try:
-        from AppKit import NSImage, NSColor
-        path = os.path.join(_ICON_DIR, filename)
-        raw = NSImage.alloc().initWithContentsOfFile_(path)
+        raw = _icon_raw(filename)
         if not raw:
             return None
         img = raw.copy()
         img.setSize_((size, size))
         if tint_hex:
-            r = int(tint_hex[1:3], 16) / 255
-            g = int(tint_hex[3:5], 16) / 255
-            b = int(tint_hex[5:7], 16) / 255
-            color = NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, 1.0)
+            color = _srgb_color(tint_hex)
             img.setTemplate_(True)
             if hasattr(img, "imageWithTintColor_"):
                 img = img.imageWithTintColor_(color)
@@ -1948,6 +2704,14 @@ def _menu_icon(filename: str, tint_hex: str | None = None, size: int = 16):
         return None
 
 
+@functools.lru_cache(maxsize=16)
+def _section_header_attrs(color_hex: str) -> dict:
+    """Bold 13pt title attributes in the given color, shared across rebuilds."""
+    from AppKit import NSFont, NSForegroundColorAttributeName, NSFontAttributeName
+    return {NSFontAttributeName: NSFont.boldSystemFontOfSize_(13),
+            NSForegroundColorAttributeName: _srgb_color(color_hex)}
+
+
 def _section_header_mi(title: str, icon_filename: str | None,
                         color_hex: str, icon_tint: str | None = None) -> rumps.MenuItem:
     """Section header with brand icon and colored bold title."""
@@ -1955,15 +2719,8 @@ def _section_header_mi(title: str, icon_filename: str | None,
     item.set_callback(None)
     item._menuitem.setEnabled_(True)
     try:
-        from AppKit import (NSColor, NSFont,
-                            NSForegroundColorAttributeName, NSFontAttributeName)
         from Foundation import NSAttributedString
-        r = int(color_hex[1:3], 16) / 255
-        g = int(color_hex[3:5], 16) / 255
-        b = int(color_hex[5:7], 16) / 255
-        color = NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, 1.0)
-        font = NSFont.boldSystemFontOfSize_(13)
-        attrs = {NSFontAttributeName: font, NSForegroundColorAttributeName: color}
+        attrs = _section_header_attrs(color_hex)
         astr = NSAttributedString.alloc().initWithString_attributes_(title, attrs)
         item._menuitem.setAttributedTitle_(astr)
         if icon_filename:
@@ -1981,16 +2738,28 @@ def _script_path() -> str:
     return os.path.abspath(__file__)
 
 
+_LAUNCH_AGENT_PLIST = os.path.expanduser("~/Library/LaunchAgents/com.claudebar.plist")
+
+
+@_ttl_memo
 def _is_login_item() -> bool:
+    """Launch-at-login is the LaunchAgent plist _add_login_item writes.
+
+    A stat instead of an osascript round-trip through System Events,
+    which never listed the plist-based agent anyway.
+    """
+    return os.path.exists(_LAUNCH_AGENT_PLIST)
+
+
+def _launchctl(action: str, plist: str):
+    """Run `launchctl <action> <plist>` (io thread); failures are logged."""
     try:
-        result = subprocess.run(
-            ["osascript", "-e",
-             'tell application "System Events" to get the name of every login item'],
-            capture_output=True, text=True, timeout=10,
-        )
-        return "claude_bar" in result.stdout.lower()
+        r = subprocess.run(["launchctl", action, plist], capture_output=True, text=True)
+        if r.returncode != 0:
+            log.warning("launchctl %s failed (%d): %s", action, r.returncode,
+                        r.stderr.strip())
     except Exception:
-        return False
+        log.debug("launchctl %s failed", action, exc_info=True)
 
 
 def _add_login_item():
@@ -2000,7 +2769,7 @@ def _add_login_item():
         f'with properties {{path:"/usr/bin/python3", name:"ClaudeBar", hidden:false}}'
     )
     # Use launchctl + a plist for reliability
-    plist = os.path.expanduser("~/Library/LaunchAgents/com.claudebar.plist")
+    plist = _LAUNCH_AGENT_PLIST
     python_exe = sys.executable
     content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
@@ -2021,14 +2790,29 @@ def _add_login_item():
 </plist>"""
     with open(plist, "w") as f:
         f.write(content)
-    subprocess.run(["launchctl", "load", plist], capture_output=True)
+    _is_login_item.invalidate()
+    _io_pool.submit(_launchctl, "load", plist)
 
 
 def _remove_login_item():
-    plist = os.path.expanduser("~/Library/LaunchAgents/com.claudebar.plist")
-    if os.path.exists(plist):
-        subprocess.run(["launchctl", "unload", plist], capture_output=True)
-        os.remove(plist)
+    # Move the plist aside right away so _is_login_item() flips immediately;
+    # launchctl only needs a readable copy to unload the job.
+    plist = _LAUNCH_AGENT_PLIST
+    unloading = plist + ".unloading"
+    try:
+        os.replace(plist, unloading)
+    except FileNotFoundError:
+        return
+    finally:
+        _is_login_item.invalidate()
+
+    def _unload():
+        _launchctl("unload", unloading)
+        try:
+            os.remove(unloading)
+        except OSError:
+            pass  # a quicker remove/add/remove cycle already cleaned it up
+    _io_pool.submit(_unload)
 
 
 # ── native macOS dialogs via osascript ───────────────────────────────────────
@@ -2057,11 +2841,11 @@ def _ask_text(title: str, prompt: str, default: str = "") -> str | None:
 
 def _clipboard_text() -> str:
     try:
-        result = subprocess.run(
-            ["pbpaste"], capture_output=True, text=True, timeout=5
-        )
-        return result.stdout.strip()
+        from AppKit import NSPasteboard, NSPasteboardTypeString
+        s = NSPasteboard.generalPasteboard().stringForType_(NSPasteboardTypeString)
+        return (s or "").strip()
     except Exception:
+        log.debug("_clipboard_text failed", exc_info=True)
         return ""
 
 
@@ -2092,8 +2876,7 @@ def _warn_keychain_once():
 _DETECT_SCRIPT = r"""
 import sys, json
 
-domain  = sys.argv[1]
-target  = sys.argv[2]
+targets = json.loads(sys.argv[1])  # [[domain, target_cookie], ...]
 
 BROWSERS = [
     'firefox', 'librewolf', 'chrome', 'arc', 'brave',
@@ -2104,7 +2887,7 @@ BROWSERS = [
 # Pick the one with the latest expiry on the target cookie so we always
 # use the freshest session (handles the case where the user is logged in
 # to multiple browsers simultaneously).
-candidates = []  # list of (expires, cookie_str)
+candidates = {domain: [] for domain, _ in targets}  # domain -> [(expires, cookie_str)]
 
 try:
     import browser_cookie3
@@ -2112,72 +2895,112 @@ try:
         fn = getattr(browser_cookie3, name, None)
         if fn is None:
             continue
-        try:
-            jar = fn(domain_name=domain)
-            cookies = {x.name: x for x in jar}
-            if target not in cookies:
-                continue
-            expires = cookies[target].expires or 0
-            cookie_str = '; '.join(f'{k}={c.value}' for k, c in cookies.items())
-            candidates.append((expires, cookie_str))
-        except Exception:
-            pass
+        for domain, target in targets:
+            try:
+                jar = fn(domain_name=domain)
+                cookies = {x.name: x for x in jar}
+                if target not in cookies:
+                    continue
+                expires = cookies[target].expires or 0
+                cookie_str = '; '.join(f'{k}={c.value}' for k, c in cookies.items())
+                candidates[domain].append((expires, cookie_str))
+            except browser_cookie3.BrowserCookieError:
+                break  # browser not installed / no cookie store: skip its other domains
+            except Exception:
+                pass
 except Exception:
     pass
 
 # Best = latest expiry; tie-break by longest cookie string (richest jar)
-result = None
-if candidates:
-    candidates.sort(key=lambda x: (x[0], len(x[1])), reverse=True)
-    result = candidates[0][1]
+result = {}
+for domain, found in candidates.items():
+    found.sort(key=lambda x: (x[0], len(x[1])), reverse=True)
+    result[domain] = found[0][1] if found else None
 
 print(json.dumps(result))
 """
 
+# Config key -> (domain, session cookie) that proves a logged-in browser
+_COOKIE_DETECT_TARGETS = {
+    "cookie_str":      ("claude.ai", "sessionKey"),
+    "chatgpt_cookies": ("chatgpt.com", "__Secure-next-auth.session-token"),
+    "copilot_cookies": ("github.com", "user_session"),
+    "cursor_cookies":  ("cursor.com", "WorkosCursorSessionToken"),
+}
+
+
+# (domain, target cookie) -> (monotonic time, result). Misses are cached
+# too: a provider the user isn't logged in to would otherwise fork a fresh
+# interpreter on every refresh.
+_cookie_detect_cache: dict[tuple[str, str], tuple[float, str | None]] = {}
+_COOKIE_DETECT_TTL = 10 * 60
+
+
+def _run_cookie_detection(
+    targets: list[tuple[str, str]], force: bool = False
+) -> dict[tuple[str, str], str | None]:
+    """Detect cookies for several (domain, target cookie) pairs at once.
 
-def _run_cookie_detection(domain: str, target_cookie: str) -> str | None:
+    Pairs not cached within _COOKIE_DETECT_TTL (or all of them, if
+    ``force``) share a single isolated browser_cookie3 child process.
+    """
+    now = time.monotonic()
+    out: dict[tuple[str, str], str | None] = {}
+    misses = []
+    for key in targets:
+        cached = _cookie_detect_cache.get(key)
+        if not force and cached and now - cached[0] < _COOKIE_DETECT_TTL:
+            out[key] = cached[1]
+        else:
+            misses.append(key)
+    if misses:
+        found = _run_cookie_detection_uncached(misses)
+        now = time.monotonic()
+        for key in misses:
+            out[key] = found.get(key[0])
+            _cookie_detect_cache[key] = (now, out[key])
+    return out
+
+
+def _run_cookie_detection_uncached(targets: list[tuple[str, str]]) -> dict:
     """Run browser_cookie3 in an isolated child process (crash-safe)."""
     try:
         r = subprocess.run(
-            [sys.executable, "-c", _DETECT_SCRIPT, domain, target_cookie],
+            [sys.executable, "-c", _DETECT_SCRIPT, json.dumps(targets)],
             capture_output=True, text=True, timeout=60,
         )
         log.debug("cookie-detect rc=%d out=%r err=%r",
                   r.returncode, r.stdout[:200], r.stderr[:200])
         if r.stdout.strip():
-            return json.loads(r.stdout.strip())
+            return json.loads(r.stdout.strip()) or {}
     except Exception as e:
         log.debug("_run_cookie_detection failed: %s", e)
-    return None
+    return {}
 
 
-def _auto_detect_cookies() -> str | None:
+def _auto_detect_cookies(force: bool = False) -> str | None:
     """Detect claude.ai session cookies from the browser (crash-safe subprocess)."""
     if not _BROWSER_COOKIE3_OK:
         return None
     _warn_keychain_once()
-    return _run_cookie_detection("claude.ai", "sessionKey")
-
+    key = _COOKIE_DETECT_TARGETS["cookie_str"]
+    return _run_cookie_detection([key], force)[key]
 
-def _auto_detect_chatgpt_cookies() -> str | None:
-    """Detect chatgpt.com session cookies from the browser (crash-safe subprocess)."""
-    if not _BROWSER_COOKIE3_OK:
-        return None
-    return _run_cookie_detection("chatgpt.com", "__Secure-next-auth.session-token")
 
+def _auto_detect_provider_cookies(cfg_keys: list[str], force: bool = False) -> dict:
+    """Detect cookies for several providers (config keys) in one subprocess.
 
-def _auto_detect_copilot_cookies() -> str | None:
-    """Detect github.com session cookies from the browser (crash-safe subprocess)."""
-    if not _BROWSER_COOKIE3_OK:
-        return None
-    return _run_cookie_detection("github.com", "user_session")
-
-
-def _auto_detect_cursor_cookies() -> str | None:
-    """Detect cursor.com session cookies from the browser (crash-safe subprocess)."""
-    if not _BROWSER_COOKIE3_OK:
-        return None
-    return _run_cookie_detection("cursor.com", "WorkosCursorSessionToken")
+    Returns {cfg_key: cookie_str} for the providers that were found.
+    """
+    if not _BROWSER_COOKIE3_OK or not cfg_keys:
+        return {}
+    found = _run_cookie_detection(
+        [_COOKIE_DETECT_TARGETS[k] for k in cfg_keys], force
+    )
+    return {
+        k: found[_COOKIE_DETECT_TARGETS[k]]
+        for k in cfg_keys if found[_COOKIE_DETECT_TARGETS[k]]
+    }
 
 
 def _notify(title: str, subtitle: str, message: str = ""):
@@ -2190,16 +3013,19 @@ def _notify(title: str, subtitle: str, message: str = ""):
 
 
 def _show_text(title: str, text: str):
-    try:
-        tmp = tempfile.NamedTemporaryFile(
-            mode="w", suffix=".txt", delete=False,
-            prefix="claude_usage_raw_"
-        )
-        tmp.write(text)
-        tmp.close()
-        subprocess.Popen(["open", "-a", "TextEdit", tmp.name])
-    except Exception:
-        log.exception("_show_text failed")
+    """Open text in TextEdit (temp file write + spawn happen on _io_pool)."""
+    def _open():
+        try:
+            tmp = tempfile.NamedTemporaryFile(
+                mode="w", suffix=".txt", delete=False,
+                prefix="claude_usage_raw_"
+            )
+            tmp.write(text)
+            tmp.close()
+            subprocess.Popen(["open", "-a", "TextEdit", tmp.name])
+        except Exception:
+            log.exception("_show_text failed")
+    _io_pool.submit(_open)
 
 
 # ── app ───────────────────────────────────────────────────────────────────────
@@ -2208,36 +3034,77 @@ class ClaudeBar(rumps.App):
     def __init__(self):
         super().__init__("◆", quit_button=None)
         self.config = load_config()
+        _org_id_cache.update(self.config.get("org_id_cache") or {})
         self._last_raw: dict = {}
         self._last_data: UsageData | None = None
         self._provider_data: list[ProviderData] = []
-        self._warned_pcts: set[str] = set()   # track which rows we've notified
-        self._prev_pcts: dict[str, int] = {}  # previous pct per row key (reset detection)
+        self._provider_by_name: dict[str, ProviderData] = {}
+        # cfg_key -> (monotonic fetch time, credential used, ProviderData)
+        self._provider_fetched: dict[str, tuple[float, str, ProviderData]] = {}
+        # Menu bar pct per provider that has one, in registry order
+        self._bar_pct_by_name: dict[str, int] = {}
+        self._auto_bar_memo: tuple | None = None   # see _auto_bar_names
+        # Row keys are (source, label) tuples; warned entries append the threshold
+        self._warned_pcts: set[tuple] = set()   # track which rows we've notified
+        self._prev_pcts: dict[tuple[str, str], int] = {}  # previous pct (reset detection)
         self._auth_fail_count = 0
-        self._fetching = False
+        # Held for the whole of a fetch: at most one in flight. A request
+        # that arrives meanwhile sets _fetch_again and runs right after.
+        self._fetch_lock = threading.Lock()
+        self._fetch_again = False
         self._last_updated: datetime | None = None
+        self._last_updated_str: str | None = None   # "HH:MM" for the footer
 
         self._refresh_interval = self.config.get("refresh_interval", DEFAULT_REFRESH)
         self._cc_stats: dict | None = None   # Claude Code local stats
-        self._history = _load_history()       # usage history for burn rate / sparkline
         self._pacing_alerted: set[str] = set()  # track which providers we've pacing-alerted
-        self._history_db = _init_history_db()
-        self._last_rollup = 0
-        try:
-            _rollup_daily_stats(self._history_db)
-            self._last_rollup = time.time()
-        except Exception:
-            log.exception("startup rollup failed")
-
-        # Thread-safe UI update queue (background thread → main thread)
-        self._ui_pending_title: str | None = None
-        self._ui_pending_data: UsageData | None = None
-        self._ui_lock = threading.Lock()
+        self._notif_cache: dict[str, bool] = {}
+        self._refresh_notif_cache()
+        # History DB is opened on _io_pool (see _open_history) so the status
+        # item appears before a large history is loaded and rolled up.
+        self._history_db: sqlite3.Connection | None = None      # db thread only
+        self._history_reader: sqlite3.Connection | None = None  # main thread
+        self._history: dict = {}  # burn rate / sparkline window
+        self._history_ready = threading.Event()
+        # Rollup cadence: monotonic so clock changes can't stall or spam it,
+        # plus the UTC date so a day that ended during sleep is rolled up
+        # on the first refresh after wake.
+        self._last_rollup = float("-inf")
+        self._rollup_day = ""
+
+        # UI mailbox (background threads → main thread): (kind, payload)
+        # messages; _flush_ui keeps only the newest of each kind.
+        self._ui_mailbox: queue.SimpleQueue = queue.SimpleQueue()
+        self._ui_latest: dict = {}   # main thread only
+        self._last_title_sig: tuple | None = None  # see _set_bar_title
+        self._last_applied_sig: tuple | None = None
+        # Menu rebuild requested by _request_rebuild (main thread only):
+        # a 1-tuple holding the data, or None when the menu is current.
+        self._menu_pending: tuple | None = None
+        self._last_rebuild = float("-inf")
+        # Inputs of the last full rebuild (see _menu_signature)
+        self._menu_sig: tuple | None = None
+        # Static submenus reused across rebuilds (see _rebuild_menu)
+        self._notif_menu: rumps.MenuItem | None = None
+        self._notif_items: dict[str, rumps.MenuItem] = {}
+        self._providers_menu: rumps.MenuItem | None = None
+        self._interval_items: dict[int, rumps.MenuItem] = {}
+        self._bar_menu: rumps.MenuItem | None = None
+        self._bar_toggle_items: dict[str, rumps.MenuItem] = {}
+        self._bar_toggle_views: dict[str, tuple] = {}   # name -> (view, label, check)
+        self._bar_auto_item: rumps.MenuItem | None = None
+        self._provider_items: dict[str, rumps.MenuItem] = {}
+        self._updated_item: rumps.MenuItem | None = None
 
         if not _is_login_item():
             _add_login_item()
+        # We are the only writer of the LaunchAgent plist, so after this
+        # check the state only changes through _toggle_login_item.
+        self._login_item_state = True
 
         self._rebuild_menu(None)
+        self._last_rebuild = time.monotonic()
+        _db_pool.submit(self._open_history)
         self._timer = rumps.Timer(self._on_timer, self._refresh_interval)
         self._timer.start()
         # Fast ticker: drains pending UI updates on the main thread (avoids AppKit crashes)
@@ -2251,10 +3118,119 @@ class ClaudeBar(rumps.App):
         # Always try to fetch on startup — browser JS works even without saved cookies
         self._schedule_fetch()
 
+    def _open_history(self):
+        """Open the history DB, load the sample window and run the startup
+        rollup (runs on _db_pool); the menu is rebuilt once it's ready."""
+        try:
+            conn = _init_history_db()
+        except Exception:
+            log.exception("history DB init failed")
+            self._history_ready.set()
+            return
+        try:
+            _migrate_legacy_history(conn)
+        except Exception:
+            log.exception("legacy history migration failed")
+        history = _load_history(conn)
+        try:
+            _rollup_daily_stats(conn)
+            self._last_rollup = time.monotonic()
+            self._rollup_day = _utc_date(time.time())
+        except Exception:
+            log.exception("startup rollup failed")
+        try:
+            reader = _open_history_reader()
+        except Exception:
+            log.debug("read-only history connection failed", exc_info=True)
+            reader = conn
+        self._history = history
+        self._history_db = conn
+        self._history_reader = reader
+        self._history_ready.set()
+        self._ui_mailbox.put(("history", True))
+
+    def _record_history(self, samples: dict[str, int], now: float):
+        """Insert one refresh's samples and run the periodic rollup (db thread)."""
+        try:
+            if self._history_db is None:
+                raise RuntimeError("history DB unavailable")
+            changed = bool(samples) and _record_samples(self._history_db, samples, now)
+            # Periodic rollup (every hour, and on UTC day change)
+            mono, today = time.monotonic(), _utc_date(now)
+            if mono - self._last_rollup > 3600 or today != self._rollup_day:
+                # Same transaction as the inserts: one commit per refresh
+                _rollup_daily_stats(self._history_db, now, commit=False)
+                self._last_rollup = mono
+                self._rollup_day = today
+                changed = True
+            _flush_history(self._history_db)
+            if changed:
+                # Only after the commit, so the reader sees what the gen names
+                _bump_history_gen()
+        except Exception:
+            log.exception("SQLite history recording failed")
+
+    def _refresh_notif_cache(self):
+        """Resolve every notification toggle once; readers index the dict."""
+        self._notif_cache = {k: _notif_enabled(self.config, k) for k in _NOTIF_DEFAULTS}
+
     # ── menu ─────────────────────────────────────────────────────────────────
 
+    def _trend_lines(self) -> dict[str, tuple[str, ...]]:
+        """Rendered ETA + sparkline menu lines per history key."""
+        history = self._history
+        out = {}
+        for key in list(history):
+            if key == "_burn":
+                continue
+            lines = []
+            eta = _calc_eta_minutes(history, key)
+            if eta is not None:
+                lines.append(f"  ⏱ Limit in ~{_fmt_eta(eta)}")
+            spark = _sparkline(history, key)
+            if spark:
+                lines += [f"  {spark}", "  📈 24h usage trend"]
+            out[key] = tuple(lines)
+        return out
+
+    def _menu_signature(self, data: UsageData | None, trend: dict) -> tuple:
+        """Everything the menu's content depends on except the footer time.
+
+        Compared with ==, not hashed, so the dataclasses can go in as-is."""
+        cfg = self.config
+        return (
+            None if data is None else (data.session, data.weekly_all,
+                                       data.weekly_sonnet, data.overages_enabled),
+            self._last_data is not None,
+            tuple(self._provider_data),
+            self._cc_stats,
+            _history_gen,
+            trend,   # what the menu shows, not how often history was appended
+            self._history_reader is not None,
+            self._history_ready.is_set(),
+            self._last_updated_str is not None,
+            # Status Bar toggles and interval checks are updated in place
+            tuple(self._notif_cache.values()),
+            tuple(bool(cfg.get(k)) for k in PROVIDER_REGISTRY),
+            self._login_item_state,
+            _is_widget_installed(),
+        )
+
     def _rebuild_menu(self, data: UsageData | None):
+        trend = self._trend_lines()
+        sig = self._menu_signature(data, trend)
+        if sig == self._menu_sig:
+            # Nothing structural changed; only the footer time can differ.
+            if self._updated_item is not None and self._last_updated_str:
+                self._updated_item.title = f"  Updated {self._last_updated_str}"
+            return
         items: list = []
+        week_hits: dict[str, int] = {}
+        if self._history_reader is not None:
+            try:
+                week_hits = _get_week_limit_hits(self._history_reader)
+            except Exception:
+                log.debug("week limit hits query failed", exc_info=True)
 
         # ── ◆  CLAUDE section ─────────────────────────────────────────────
         items.append(_section_header_mi("  Claude", "claude_icon.png", "#D97757"))
@@ -2267,17 +3243,8 @@ class ClaudeBar(rumps.App):
                 items.append(_mi(lines[0]))
                 items.append(_colored_mi(lines[1], "#D97757"))
                 # ETA + sparkline for Claude session
-                eta = _calc_eta_minutes(self._history, "claude")
-                if eta is not None:
-                    items.append(_mi(f"  ⏱ Limit in ~{_fmt_eta(eta)}"))
-                spark = _sparkline(self._history, "claude")
-                if spark:
-                    items.append(_mi(f"  {spark}"))
-                    items.append(_mi(f"  📈 24h usage trend"))
-                try:
-                    hits = _get_week_limit_hits(self._history_db, "claude")
-                except Exception:
-                    hits = 0
+                items.extend(_mi(t) for t in trend.get("claude", ()))
+                hits = week_hits.get("claude", 0)
                 if hits > 0:
                     items.append(_mi(f"  Hit limit {hits}x this week"))
                 items.append(None)
@@ -2295,30 +3262,19 @@ class ClaudeBar(rumps.App):
                 items.append(None)
 
         # ── ◇  CHATGPT section (if detected) ──────────────────────────────
-        chatgpt_pd = next(
-            (pd for pd in self._provider_data if pd.name == "ChatGPT"), None
-        )
+        chatgpt_pd = self._provider_by_name.get("ChatGPT")
         if chatgpt_pd:
             items.append(_section_header_mi("  ChatGPT", "chatgpt_icon_clean.png",
                                             "#74AA9C", icon_tint="#74AA9C"))
-            rows = getattr(chatgpt_pd, "_rows", None)
+            rows = chatgpt_pd._rows
             if rows:
                 for row in rows:
                     lines = _row_lines(row)
                     items.append(_mi(lines[0]))
                     items.append(_colored_mi(lines[1], "#74AA9C"))
-                    hkey = f"chatgpt_{row.label.lower().replace(' ', '_')}"
-                    eta = _calc_eta_minutes(self._history, hkey)
-                    if eta is not None:
-                        items.append(_mi(f"  ⏱ Limit in ~{_fmt_eta(eta)}"))
-                    spark = _sparkline(self._history, hkey)
-                    if spark:
-                        items.append(_mi(f"  {spark}"))
-                        items.append(_mi(f"  📈 24h usage trend"))
-                    try:
-                        hits = _get_week_limit_hits(self._history_db, hkey)
-                    except Exception:
-                        hits = 0
+                    hkey = f"chatgpt_{row.hkey_suffix}"
+                    items.extend(_mi(t) for t in trend.get(hkey, ()))
+                    hits = week_hits.get(hkey, 0)
                     if hits > 0:
                         items.append(_mi(f"  Hit limit {hits}x this week"))
                     items.append(None)
@@ -2329,54 +3285,32 @@ class ClaudeBar(rumps.App):
                 items.append(None)
 
         # ── ◇  COPILOT section (if detected) ─────────────────────────────────
-        copilot_pd = next(
-            (pd for pd in self._provider_data if pd.name == "Copilot"), None
-        )
+        copilot_pd = self._provider_by_name.get("Copilot")
         if copilot_pd:
             items.append(_section_header_mi("  GitHub Copilot", "copilot.png", "#6E40C9", icon_tint="#9B6BFF"))
             for line in _provider_lines(copilot_pd):
                 if line:
                     items.append(_mi(line))
             # ETA + sparkline for Copilot
-            eta = _calc_eta_minutes(self._history, "copilot")
-            if eta is not None:
-                items.append(_mi(f"  ⏱ Limit in ~{_fmt_eta(eta)}"))
-            spark = _sparkline(self._history, "copilot")
-            if spark:
-                items.append(_mi(f"  {spark}"))
-                items.append(_mi(f"  📈 24h usage trend"))
-            try:
-                hits = _get_week_limit_hits(self._history_db, "copilot")
-            except Exception:
-                hits = 0
+            items.extend(_mi(t) for t in trend.get("copilot", ()))
+            hits = week_hits.get("copilot", 0)
             if hits > 0:
                 items.append(_mi(f"  Hit limit {hits}x this week"))
             items.append(None)
 
         # ── ◇  CURSOR section (if detected) ──────────────────────────────────
-        cursor_pd = next(
-            (pd for pd in self._provider_data if pd.name == "Cursor"), None
-        )
+        cursor_pd = self._provider_by_name.get("Cursor")
         if cursor_pd:
             items.append(_section_header_mi("  Cursor", "cursor.png", "#00A0D1", icon_tint="#00A0D1"))
-            rows = getattr(cursor_pd, "_rows", None)
+            rows = cursor_pd._rows
             if rows:
                 for row in rows:
                     lines = _row_lines(row)
                     items.append(_mi(lines[0]))
                     items.append(_colored_mi(lines[1], "#00A0D1"))
-                    hkey = f"cursor_{row.label.lower().replace(' ', '_')}"
-                    eta = _calc_eta_minutes(self._history, hkey)
-                    if eta is not None:
-                        items.append(_mi(f"  ⏱ Limit in ~{_fmt_eta(eta)}"))
-                    spark = _sparkline(self._history, hkey)
-                    if spark:
-                        items.append(_mi(f"  {spark}"))
-                        items.append(_mi(f"  📈 24h usage trend"))
-                    try:
-                        hits = _get_week_limit_hits(self._history_db, hkey)
-                    except Exception:
-                        hits = 0
+                    hkey = f"cursor_{row.hkey_suffix}"
+                    items.extend(_mi(t) for t in trend.get(hkey, ()))
+                    hits = week_hits.get(hkey, 0)
                     if hits > 0:
                         items.append(_mi(f"  Hit limit {hits}x this week"))
                     items.append(None)
@@ -2418,24 +3352,30 @@ class ClaudeBar(rumps.App):
             items.append(None)
 
         # ── Usage History window ──────────────────────────────────────────
-        try:
-            today_stats = _get_today_stats(self._history_db)
-            past_keys = {r[0] for r in self._history_db.execute(
-                "SELECT DISTINCT key FROM daily_stats"
-            ).fetchall()}
-            has_history = bool(past_keys or today_stats)
-            if has_history:
-                items.append(rumps.MenuItem(
-                    "Usage History\u2026", callback=self._open_history_window,
-                ))
+        if self._history_reader is None:
+            if not self._history_ready.is_set():
+                items.append(_mi("Loading history\u2026"))
                 items.append(None)
-        except Exception:
-            log.exception("Usage History menu item failed")
+        else:
+            try:
+                today_stats = _get_today_stats(self._history_reader)
+                past_keys = {r[0] for r in self._history_reader.execute(
+                    "SELECT DISTINCT key FROM daily_stats"
+                ).fetchall()}
+                has_history = bool(past_keys or today_stats)
+                if has_history:
+                    items.append(rumps.MenuItem(
+                        "Usage History\u2026", callback=self._open_history_window,
+                    ))
+                    items.append(None)
+            except Exception:
+                log.exception("Usage History menu item failed")
 
         # ── Footer ────────────────────────────────────────────────────────
-        if self._last_updated:
-            t = self._last_updated.strftime("%H:%M")
-            items.append(_mi(f"  Updated {t}"))
+        self._updated_item = None
+        if self._last_updated_str:
+            self._updated_item = _mi(f"  Updated {self._last_updated_str}")
+            items.append(self._updated_item)
             items.append(None)
 
         # ── Actions ──────────────────────────────────────────────────────
@@ -2445,72 +3385,64 @@ class ClaudeBar(rumps.App):
         items.append(rumps.MenuItem("⭐ Star on GitHub", callback=self._open_github))
         items.append(None)
 
-        # Status bar display submenu
-        bar_menu = rumps.MenuItem("Status Bar")
-        chosen = self.config.get("bar_providers") or []
-        # In auto mode, compute which providers would be shown
-        if not chosen:
-            available_names = {"Claude"} if self._last_data else set()
-            for pd in self._provider_data:
-                if self._provider_bar_pct(pd) is not None:
-                    available_names.add(pd.name)
-            auto_shown = [n for n in self._BAR_PRIORITY if n in available_names][:2]
-        else:
-            auto_shown = []
-        self._bar_toggle_views = {}
-        for name in self._BAR_PRIORITY:
-            is_on = name in chosen if chosen else name in auto_shown
-            item = self._make_sticky_toggle(name, is_on, name)
-            bar_menu.add(item)
-        bar_menu.add(None)
-        is_auto = not chosen
-        auto_item = rumps.MenuItem(
-            "✓ Auto (top 2 active)" if is_auto else "Reset to Auto",
-            callback=self._bar_reset_auto,
-        )
-        bar_menu.add(auto_item)
-        items.append(bar_menu)
+        # Status bar display submenu: the toggle views are built once and
+        # kept with their submenu; later rebuilds only refresh the checks.
+        if self._bar_menu is None:
+            self._bar_menu = rumps.MenuItem("Status Bar")
+            for name in self._BAR_PRIORITY:
+                item = self._make_sticky_toggle(name, False, name)
+                self._bar_toggle_items[name] = item
+                self._bar_menu.add(item)
+            self._bar_menu.add(None)
+            self._bar_auto_item = rumps.MenuItem(
+                "Reset to Auto", callback=self._bar_reset_auto,
+            )
+            self._bar_menu.add(self._bar_auto_item)
+        self._refresh_toggle_checks()
+        items.append(self._bar_menu)
 
         # Refresh interval submenu
         interval_menu = rumps.MenuItem("Refresh Interval")
+        self._interval_items = {}
         for label, secs in REFRESH_INTERVALS.items():
             item = rumps.MenuItem(label, callback=self._make_interval_cb(secs, label))
             item._menuitem.setState_(1 if secs == self._refresh_interval else 0)
+            self._interval_items[secs] = item
             interval_menu.add(item)
         items.append(interval_menu)
 
-        # Notifications submenu
-        notif_menu = rumps.MenuItem("Notifications")
-        _notif_labels = [
-            ("claude_warning",  "Claude — usage warnings (80% / 95%)"),
-            ("claude_reset",    "Claude — reset alerts"),
-            ("claude_pacing",   "Claude — pacing alert (ETA < 30 min)"),
-            ("chatgpt_warning", "ChatGPT — usage warnings (80% / 95%)"),
-            ("chatgpt_reset",   "ChatGPT — reset alerts"),
-            ("chatgpt_pacing",  "ChatGPT — pacing alert (ETA < 30 min)"),
-            ("copilot_pacing",  "Copilot — pacing alert (ETA < 30 min)"),
-            ("cursor_warning",  "Cursor — usage warnings (80% / 95%)"),
-            ("cursor_pacing",   "Cursor — pacing alert (ETA < 30 min)"),
-        ]
-        for nkey, nlabel in _notif_labels:
-            item = rumps.MenuItem(nlabel, callback=self._make_notif_toggle_cb(nkey))
-            item._menuitem.setState_(1 if _notif_enabled(self.config, nkey) else 0)
-            notif_menu.add(item)
-        items.append(notif_menu)
+        # Notifications and API Providers submenus: built once, then only
+        # their states/titles are updated (submenu items stay attached to
+        # their submenu across self.menu.clear()).
+        if self._notif_menu is None:
+            self._notif_menu = rumps.MenuItem("Notifications")
+            for nkey, nlabel in self._NOTIF_LABELS:
+                item = rumps.MenuItem(nlabel, callback=self._make_notif_toggle_cb(nkey))
+                self._notif_items[nkey] = item
+                self._notif_menu.add(item)
+        for nkey, item in self._notif_items.items():
+            item._menuitem.setState_(1 if self._notif_cache[nkey] else 0)
+        items.append(self._notif_menu)
         items.append(None)
 
-        # API providers submenu
-        providers_menu = rumps.MenuItem("API Providers")
-        for cfg_key, (name, _) in PROVIDER_REGISTRY.items():
-            is_set = bool(self.config.get(cfg_key))
+        if self._providers_menu is None:
+            self._providers_menu = rumps.MenuItem("API Providers")
+            for cfg_key, (name, _) in PROVIDER_REGISTRY.items():
+                item = rumps.MenuItem(
+                    name, callback=self._make_provider_key_cb(cfg_key, name)
+                )
+                self._provider_items[cfg_key] = item
+                self._providers_menu.add(item)
+        for cfg_key, item in self._provider_items.items():
+            name = PROVIDER_REGISTRY[cfg_key][0]
+            mark = "✓" if self.config.get(cfg_key) else "+"
             if cfg_key in _COOKIE_PROVIDERS:
-                label = f"{'✓' if is_set else '+'} {name} (auto-detect)"
+                label = f"{mark} {name} (auto-detect)"
             else:
-                label = f"{'✓' if is_set else '+'} {name} API Key…"
-            providers_menu.add(rumps.MenuItem(
-                label, callback=self._make_provider_key_cb(cfg_key, name)
-            ))
-        items.append(providers_menu)
+                label = f"{mark} {name} API Key…"
+            if item.title != label:
+                item.title = label
+        items.append(self._providers_menu)
 
         items.append(None)
         items.append(rumps.MenuItem("Auto-detect from Browser", callback=self._auto_detect_menu))
@@ -2520,7 +3452,7 @@ class ClaudeBar(rumps.App):
         items.append(None)
 
         login_item = rumps.MenuItem("Launch at Login", callback=self._toggle_login_item)
-        login_item._menuitem.setState_(1 if _is_login_item() else 0)
+        login_item._menuitem.setState_(1 if self._login_item_state else 0)
         items.append(login_item)
 
         # Desktop Widget status
@@ -2537,10 +3469,11 @@ class ClaudeBar(rumps.App):
         items.append(widget_item)
 
         items.append(None)
-        items.append(rumps.MenuItem("Quit", callback=rumps.quit_application))
+        items.append(rumps.MenuItem("Quit", callback=self._quit))
 
         self.menu.clear()
         self.menu = items
+        self._menu_sig = sig
         # Prevent macOS from auto-disabling display-only items
         try:
             ns_menu = self._nsapp.nsstatusitem.menu()
@@ -2553,25 +3486,56 @@ class ClaudeBar(rumps.App):
 
     def _post_title(self, title: str):
         """Queue a title update from any thread."""
-        with self._ui_lock:
-            self._ui_pending_title = title
+        self._ui_mailbox.put(("title", title))
 
     def _post_data(self, data: UsageData):
         """Queue a full UI update (title + menu) from any thread."""
-        with self._ui_lock:
-            self._ui_pending_data = data
+        self._ui_mailbox.put(("data", (data, time.monotonic())))
 
     def _flush_ui(self, _timer):
         """Main-thread ticker: apply any queued updates from background threads."""
-        with self._ui_lock:
-            title = self._ui_pending_title
-            data = self._ui_pending_data
-            self._ui_pending_title = None
-            self._ui_pending_data = None
+        latest = self._ui_latest
+        while True:
+            try:
+                kind, payload = self._ui_mailbox.get_nowait()
+            except queue.Empty:
+                break
+            latest[kind] = payload
+        title = latest.pop("title", None)
+        history_loaded = latest.pop("history", False)
+        data = None
+        held = latest.get("data")
+        # Let a burst of posts settle so only the last one is applied
+        if held is not None and time.monotonic() - held[1] >= _UI_COALESCE_GAP:
+            data = held[0]
+            del latest["data"]
         if data is not None:
-            self._apply(data)
+            sig = (data.session, data.weekly_all, data.weekly_sonnet,
+                   data.overages_enabled, tuple(self._provider_data), self._cc_stats)
+            if sig != self._last_applied_sig:
+                self._last_applied_sig = sig
+                self._apply(data)
+            else:
+                # Same payload: the title stands, only the footer time moves
+                self._request_rebuild(data)
         elif title is not None:
             self.title = title
+            self._last_title_sig = None
+            self._last_applied_sig = None  # next data must restore the title
+        if history_loaded:
+            self._request_rebuild(self._last_data)
+        pending = self._menu_pending
+        if pending is not None:
+            mono = time.monotonic()
+            if mono - self._last_rebuild >= _MENU_REBUILD_MIN_GAP:
+                self._menu_pending = None
+                self._last_rebuild = mono
+                self._rebuild_menu(pending[0])
+
+    def _request_rebuild(self, data: UsageData | None):
+        """Mark the menu stale (main thread). _flush_ui rebuilds it at most
+        once per _MENU_REBUILD_MIN_GAP with the latest requested data."""
+        self._menu_pending = (data,)
 
     # ── widget ─────────────────────────────────────────────────────────────────
 
@@ -2602,7 +3566,7 @@ class ClaudeBar(rumps.App):
                     sound=True,
                 )
             self.config["seen_welcome"] = True
-            save_config(self.config)
+            _save_config_soon(self.config)
         else:
             # Subsequent launches — brief notification
             if widget_ok:
@@ -2663,12 +3627,25 @@ class ClaudeBar(rumps.App):
         self._schedule_fetch()
 
     def _schedule_fetch(self):
-        if self._fetching:
+        if not self._fetch_lock.acquire(blocking=False):
+            self._fetch_again = True
             return
-        threading.Thread(target=self._fetch_and_update, daemon=True).start()
+        self._fetch_again = False
+        # On the fetch pool too, so the Claude requests reuse a warm Session
+        _fetch_pool.submit(self._fetch_and_update_locked)
+
+    def _fetch_and_update_locked(self):
+        """Pool task: run one fetch, then release the lock taken by
+        _schedule_fetch (and start the follow-up fetch if one was asked for)."""
+        try:
+            self._fetch_and_update()
+        finally:
+            self._fetch_lock.release()
+        if self._fetch_again:
+            self._schedule_fetch()
 
     def _fetch_and_update(self):
-        self._fetching = True
+        self._refresh_notif_cache()
 
         try:
             sk = self.config.get("cookie_str")
@@ -2676,68 +3653,65 @@ class ClaudeBar(rumps.App):
                 sk = _auto_detect_cookies()
                 if sk:
                     self.config["cookie_str"] = sk
-                    save_config(self.config)
+                    _save_config_soon(self.config)
             if not sk:
                 self._post_title("◆")
-                self._fetching = False
                 return
-            raw = fetch_raw(sk)
+            # Claude and the other providers are fetched concurrently
+            raw_future = _fetch_pool.submit(fetch_raw, sk)
+            self._fetch_providers()
+            raw = raw_future.result()
+            # One clock read for everything this tick derives from "now"
+            now = time.time()
             self._last_raw = raw
+            # Persist a newly discovered org id so cold starts skip discovery
+            ck = _cookie_hash(sk)
+            if ck in _org_id_cache:
+                entry = {ck: _org_id_cache[ck]}
+                if self.config.get("org_id_cache") != entry:
+                    self.config["org_id_cache"] = entry
+                    _save_config_soon(self.config)
             self._auth_fail_count = 0
-            data = parse_usage(raw)
+            data = parse_usage(raw, now)
             self._last_data = data
-            self._last_updated = datetime.now()
+            self._last_updated = datetime.fromtimestamp(now)
+            self._last_updated_str = self._last_updated.strftime("%H:%M")
             log.debug("parsed UsageData: %s", data)
-            self._check_warnings(data)
-            self._fetch_providers()
-            self._check_provider_warnings(self._provider_data)
-            self._cc_stats = fetch_claude_code_stats()
+            self._check_warnings(data, self._provider_data)
+            self._cc_stats = fetch_claude_code_stats(now)
 
             # ── record usage history ──
+            # A fetch can finish before _open_history on a cold start.
+            self._history_ready.wait(30)
+            samples: dict[str, int] = {}
             if data.session:
-                _append_history(self._history, "claude", data.session.pct)
+                samples["claude"] = data.session.pct
             # Per-row history for multi-limit providers (avoids mixing
             # different limit types which made ETAs jump around).
             for prefix, pname in [("chatgpt", "ChatGPT"), ("cursor", "Cursor")]:
-                pd = next((p for p in self._provider_data if p.name == pname), None)
+                pd = self._provider_by_name.get(pname)
                 if pd and not pd.error:
-                    rows = getattr(pd, "_rows", None)
+                    rows = pd._rows
                     if rows:
                         for row in rows:
-                            hkey = f"{prefix}_{row.label.lower().replace(' ', '_')}"
-                            _append_history(self._history, hkey, row.pct)
-            copilot_pd = next(
-                (pd for pd in self._provider_data if pd.name == "Copilot"), None
-            )
+                            hkey = f"{prefix}_{row.hkey_suffix}"
+                            samples[hkey] = row.pct
+            copilot_pd = self._provider_by_name.get("Copilot")
             if copilot_pd and not copilot_pd.error and copilot_pd.pct is not None:
-                _append_history(self._history, "copilot", copilot_pd.pct)
-            _save_history(self._history)
+                samples["copilot"] = copilot_pd.pct
+            for key, pct in samples.items():
+                _append_history(self._history, key, pct, now)
 
             # ── record to SQLite history ──
-            try:
-                if data.session:
-                    _record_sample(self._history_db, "claude", data.session.pct)
-                for prefix, pname in [("chatgpt", "ChatGPT"), ("cursor", "Cursor")]:
-                    pd = next((p for p in self._provider_data if p.name == pname), None)
-                    if pd and not pd.error:
-                        rows = getattr(pd, "_rows", None)
-                        if rows:
-                            for row in rows:
-                                hkey = f"{prefix}_{row.label.lower().replace(' ', '_')}"
-                                _record_sample(self._history_db, hkey, row.pct)
-                if copilot_pd and not copilot_pd.error and copilot_pd.pct is not None:
-                    _record_sample(self._history_db, "copilot", copilot_pd.pct)
-                # Periodic rollup (every hour)
-                if time.time() - self._last_rollup > 3600:
-                    _rollup_daily_stats(self._history_db)
-                    self._last_rollup = time.time()
-            except Exception:
-                log.exception("SQLite history recording failed")
+            # Waited on so the menu built from this data sees the new rows.
+            _db_pool.submit(self._record_history, samples, now).result()
 
             self._check_pacing_alerts()
 
             self._post_data(data)          # ← main thread applies title + menu
-            _write_widget_cache(data, self._provider_data, self._cc_stats, self.config)
+            _queue_widget_cache(
+                data, self._provider_data, self._cc_stats, self.config, now
+            )
         except CurlHTTPError as e:
             resp = getattr(e, "response", None)
             code = getattr(resp, "status_code", 0) or 0
@@ -2747,10 +3721,10 @@ class ClaudeBar(rumps.App):
                 self._post_title("◆ !")
                 if self._auth_fail_count >= 2:
                     self._auth_fail_count = 0
-                    cookie_str = _auto_detect_cookies()
+                    cookie_str = _auto_detect_cookies(force=True)
                     if cookie_str:
                         self.config["cookie_str"] = cookie_str
-                        save_config(self.config)
+                        _save_config_soon(self.config)
                         self._warned_pcts.clear()
                         log.info("Auth failed — auto-detected fresh cookies from browser")
                         self._schedule_fetch()
@@ -2765,112 +3739,79 @@ class ClaudeBar(rumps.App):
         except Exception:
             log.exception("fetch failed")
             self._post_title("◆ ?")
-        finally:
-            self._fetching = False
 
-    def _check_warnings(self, data: UsageData):
-        """Send macOS notification when a Claude limit crosses a threshold or resets."""
-        rows = [
-            (data.session,       "session"),
-            (data.weekly_all,    "weekly_all"),
-            (data.weekly_sonnet, "weekly_sonnet"),
-        ]
-        warn_enabled = _notif_enabled(self.config, "claude_warning")
-        reset_enabled = _notif_enabled(self.config, "claude_reset")
+    # (provider name, history prefix, warning toggle, reset toggle)
+    _WARN_PROVIDERS = (
+        ("ChatGPT", "chatgpt", "chatgpt_warning", "chatgpt_reset"),
+        ("Cursor",  "cursor",  "cursor_warning",  None),
+    )
 
-        for row, key in rows:
-            if row is None:
+    def _warning_series(self, data: UsageData, provider_data: list) -> list[tuple]:
+        """Every limit row that can notify, as
+        (key, display name, row, warn_enabled, reset_enabled)."""
+        notif = self._notif_cache
+        series = []
+        warn_on, reset_on = notif["claude_warning"], notif["claude_reset"]
+        for row, name in ((data.session, "session"),
+                          (data.weekly_all, "weekly_all"),
+                          (data.weekly_sonnet, "weekly_sonnet")):
+            if row is not None:
+                series.append((("claude", name), row.label, row, warn_on, reset_on))
+        by_name = {p.name: p for p in provider_data}
+        for pname, prefix, warn_nkey, reset_nkey in self._WARN_PROVIDERS:
+            pd = by_name.get(pname)
+            if pd is None or pd.error:
                 continue
-            warn_key = f"{key}_{WARN_THRESHOLD}"
-            crit_key = f"{key}_{CRIT_THRESHOLD}"
+            warn_on = notif[warn_nkey]
+            reset_on = notif[reset_nkey] if reset_nkey else False
+            for row in pd._rows or ():
+                series.append(((prefix, row.label), f"{pname} {row.label}",
+                               row, warn_on, reset_on))
+        return series
+
+    def _check_warnings(self, data: UsageData, provider_data: list):
+        """Send macOS notification when a Claude or provider limit crosses a
+        threshold or resets — one pass over _warning_series()."""
+        warned = self._warned_pcts
+        for key, display, row, warn_enabled, reset_enabled in \
+                self._warning_series(data, provider_data):
+            warn_key = (*key, WARN_THRESHOLD)
+            crit_key = (*key, CRIT_THRESHOLD)
             prev = self._prev_pcts.get(key)
 
             # Reset detection: pct dropped significantly (≥10 pp) from above-warn to below
             if (reset_enabled and prev is not None
                     and prev >= WARN_THRESHOLD and row.pct < WARN_THRESHOLD
                     and (prev - row.pct) >= 10):
-                self._warned_pcts.discard(warn_key)
-                self._warned_pcts.discard(crit_key)
+                warned.discard(warn_key)
+                warned.discard(crit_key)
                 _notify(
                     "Claude Usage Bar ✅",
-                    f"{row.label} has reset!",
+                    f"{display} has reset!",
                     f"Now at {row.pct}% — you're good to go.",
                 )
 
             if warn_enabled:
-                if row.pct >= CRIT_THRESHOLD and crit_key not in self._warned_pcts:
-                    self._warned_pcts.add(crit_key)
+                if row.pct >= CRIT_THRESHOLD and crit_key not in warned:
+                    warned.add(crit_key)
                     _notify(
                         "Claude Usage Bar 🔴",
-                        f"{row.label} is at {row.pct}%!",
+                        f"{display} is at {row.pct}%!",
                         row.reset_str or "Limit almost reached",
                     )
-                elif row.pct >= WARN_THRESHOLD and warn_key not in self._warned_pcts:
-                    self._warned_pcts.add(warn_key)
+                elif row.pct >= WARN_THRESHOLD and warn_key not in warned:
+                    warned.add(warn_key)
                     _notify(
                         "Claude Usage Bar 🟡",
-                        f"{row.label} is at {row.pct}%",
+                        f"{display} is at {row.pct}%",
                         row.reset_str or "Approaching limit",
                     )
                 elif row.pct < WARN_THRESHOLD:
-                    self._warned_pcts.discard(warn_key)
-                    self._warned_pcts.discard(crit_key)
+                    warned.discard(warn_key)
+                    warned.discard(crit_key)
 
             self._prev_pcts[key] = row.pct
 
-    def _check_provider_warnings(self, provider_data: list):
-        """Send macOS notification when provider rate limits cross a threshold or reset."""
-        _warn_providers = [
-            ("ChatGPT", "chatgpt", "chatgpt_warning", "chatgpt_reset"),
-            ("Cursor",  "cursor",  "cursor_warning",  None),
-        ]
-        for pname, prefix, warn_nkey, reset_nkey in _warn_providers:
-            pd = next((p for p in provider_data if p.name == pname), None)
-            if pd is None or pd.error:
-                continue
-
-            rows = getattr(pd, "_rows", None) or []
-            warn_enabled = _notif_enabled(self.config, warn_nkey)
-            reset_enabled = _notif_enabled(self.config, reset_nkey) if reset_nkey else False
-
-            for row in rows:
-                key = f"{prefix}_{row.label}"
-                warn_key = f"{key}_{WARN_THRESHOLD}"
-                crit_key = f"{key}_{CRIT_THRESHOLD}"
-                prev = self._prev_pcts.get(key)
-
-                if (reset_enabled and prev is not None
-                        and prev >= WARN_THRESHOLD and row.pct < WARN_THRESHOLD
-                        and (prev - row.pct) >= 10):
-                    self._warned_pcts.discard(warn_key)
-                    self._warned_pcts.discard(crit_key)
-                    _notify(
-                        "Claude Usage Bar ✅",
-                        f"{pname} {row.label} has reset!",
-                        f"Now at {row.pct}% — you're good to go.",
-                    )
-
-                if warn_enabled:
-                    if row.pct >= CRIT_THRESHOLD and crit_key not in self._warned_pcts:
-                        self._warned_pcts.add(crit_key)
-                        _notify(
-                            "Claude Usage Bar 🔴",
-                            f"{pname} {row.label} is at {row.pct}%!",
-                            row.reset_str or "Limit almost reached",
-                        )
-                    elif row.pct >= WARN_THRESHOLD and warn_key not in self._warned_pcts:
-                        self._warned_pcts.add(warn_key)
-                        _notify(
-                            "Claude Usage Bar 🟡",
-                            f"{pname} {row.label} is at {row.pct}%",
-                            row.reset_str or "Approaching limit",
-                        )
-                    elif row.pct < WARN_THRESHOLD:
-                        self._warned_pcts.discard(warn_key)
-                        self._warned_pcts.discard(crit_key)
-
-                self._prev_pcts[key] = row.pct
-
     def _check_pacing_alerts(self):
         """Send predictive notification when ETA drops below PACING_ALERT_MINUTES."""
         # Static entries (single history key per provider)
@@ -2883,15 +3824,15 @@ class ClaudeBar(rumps.App):
             ("chatgpt", "ChatGPT", "chatgpt_pacing"),
             ("cursor",  "Cursor",  "cursor_pacing"),
         ]:
-            pd = next((p for p in self._provider_data if p.name == pname), None)
+            pd = self._provider_by_name.get(pname)
             if pd and not pd.error:
-                rows = getattr(pd, "_rows", None) or []
+                rows = pd._rows or []
                 for row in rows:
-                    hkey = f"{prefix}_{row.label.lower().replace(' ', '_')}"
+                    hkey = f"{prefix}_{row.hkey_suffix}"
                     checks.append((hkey, nkey, f"{pname} {row.label}"))
 
         for hkey, nkey, label in checks:
-            if not _notif_enabled(self.config, nkey):
+            if not self._notif_cache[nkey]:
                 continue
             eta = _calc_eta_minutes(self._history, hkey)
             if eta is not None and eta <= PACING_ALERT_MINUTES:
@@ -2921,18 +3862,16 @@ class ClaudeBar(rumps.App):
           e.g. [("Claude", 36, " ·"), ("ChatGPT", 12, "")]
 
         Falls back to colored text symbols if AppKit / icons unavailable.
+        Skipped when the segments match the title already on screen.
         """
+        sig = (tuple(provider_segments), cc_msgs)
+        if sig == self._last_title_sig:
+            return
         try:
-            from AppKit import (NSColor, NSFont,
+            from AppKit import (NSFont,
                                 NSForegroundColorAttributeName, NSFontAttributeName)
             from Foundation import NSMutableAttributedString, NSAttributedString
 
-            def _rgb(hex_str):
-                r = int(hex_str[1:3], 16) / 255
-                g = int(hex_str[3:5], 16) / 255
-                b = int(hex_str[5:7], 16) / 255
-                return NSColor.colorWithSRGBRed_green_blue_alpha_(r, g, b, 1.0)
-
             font = NSFont.menuBarFontOfSize_(0)
             base = {NSFontAttributeName: font} if font else {}
 
@@ -2941,7 +3880,7 @@ class ClaudeBar(rumps.App):
             for i, (name, pct, suffix) in enumerate(provider_segments):
                 cfg = self._BAR_PROVIDERS.get(name, {})
                 color_hex = cfg.get("color", "#AAAAAA")
-                color = _rgb(color_hex)
+                color = _srgb_color(color_hex)
 
                 if i > 0:
                     s.appendAttributedString_(
@@ -2950,9 +3889,9 @@ class ClaudeBar(rumps.App):
 
                 icon_file = cfg.get("icon")
                 tint = cfg.get("tint")
-                img = _bar_icon(icon_file, tint_hex=tint) if icon_file else None
-                if img:
-                    s.appendAttributedString_(_icon_astr(img, base))
+                icon = _bar_icon_astr(icon_file, tint, base) if icon_file else None
+                if icon:
+                    s.appendAttributedString_(icon)
                 else:
                     sym = cfg.get("sym", "●")
                     seg = NSMutableAttributedString.alloc().initWithString_attributes_(f"{sym} ", base)
@@ -2965,7 +3904,7 @@ class ClaudeBar(rumps.App):
 
             # ── Claude Code  ◆ 3.2k ────────────────────────
             if cc_msgs is not None and cc_msgs > 0:
-                cc_color = _rgb("#D97757")
+                cc_color = _srgb_color("#D97757")
                 seg = NSMutableAttributedString.alloc().initWithString_attributes_(
                     f"   ◆ {_fmt_count(cc_msgs)}", base
                 )
@@ -2973,6 +3912,7 @@ class ClaudeBar(rumps.App):
                 s.appendAttributedString_(seg)
 
             self._nsapp.nsstatusitem.setAttributedTitle_(s)
+            self._last_title_sig = sig
             return
         except Exception as e:
             log.debug("_set_bar_title failed: %s", e)
@@ -2985,12 +3925,13 @@ class ClaudeBar(rumps.App):
         if cc_msgs is not None and cc_msgs > 0:
             parts.append(f"◆ {_fmt_count(cc_msgs)}")
         self.title = "  ".join(parts)
+        self._last_title_sig = None
 
     def _provider_bar_pct(self, pd: ProviderData) -> int | None:
         """Extract a single percentage for the menu bar from a provider."""
         if pd.error:
             return None
-        rows = getattr(pd, "_rows", None)
+        rows = pd._rows
         if rows:
             return max(r.pct for r in rows)
         if pd.pct is not None:
@@ -3000,6 +3941,22 @@ class ClaudeBar(rumps.App):
     # Priority order for the 2 bar slots (highest first)
     _BAR_PRIORITY = ["Claude", "ChatGPT", "Cursor", "Copilot"]
 
+    def _auto_bar_names(self) -> tuple[str, ...]:
+        """Providers auto mode shows: the top 2 by _BAR_PRIORITY that have data.
+
+        Memoized on which providers currently have a bar pct.
+        """
+        key = (self._last_data is not None, tuple(self._bar_pct_by_name))
+        memo = self._auto_bar_memo
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        shown = tuple(
+            n for n in self._BAR_PRIORITY
+            if (n == "Claude" and key[0]) or n in self._bar_pct_by_name
+        )[:2]
+        self._auto_bar_memo = (key, shown)
+        return shown
+
     def _apply(self, data: UsageData):
         primary = data.session or data.weekly_all or data.weekly_sonnet
         if primary:
@@ -3013,10 +3970,8 @@ class ClaudeBar(rumps.App):
             # Collect all available segments
             available: dict[str, tuple[str, int, str]] = {}
             available["Claude"] = ("Claude", primary.pct, extra)
-            for pd in self._provider_data:
-                bar_pct = self._provider_bar_pct(pd)
-                if bar_pct is not None:
-                    available[pd.name] = (pd.name, bar_pct, "")
+            for name, bar_pct in self._bar_pct_by_name.items():
+                available[name] = (name, bar_pct, "")
 
             # User-configured bar providers, or auto top 2 by priority
             chosen = self.config.get("bar_providers")
@@ -3034,43 +3989,79 @@ class ClaudeBar(rumps.App):
             self._set_bar_title(segments, cc_msgs=cc_msgs)
         else:
             self.title = "◆"
-        self._rebuild_menu(data)
+            self._last_title_sig = None
+        self._request_rebuild(data)
 
     def _fetch_providers(self):
         """Fetch all configured third-party API providers (sync, called from fetch thread)."""
-        # Auto-detect ChatGPT cookies if not saved yet
-        _cookie_detectors = {
-            "chatgpt_cookies": _auto_detect_chatgpt_cookies,
-            "copilot_cookies": _auto_detect_copilot_cookies,
-            "cursor_cookies":  _auto_detect_cursor_cookies,
-        }
-        for cfg_key in _COOKIE_PROVIDERS:
-            if not self.config.get(cfg_key):
-                detect_fn = _cookie_detectors.get(cfg_key)
-                if detect_fn:
-                    ck = detect_fn()
-                    if ck:
-                        self.config[cfg_key] = ck
-                        save_config(self.config)
-
-        results = []
-        for cfg_key, (name, fetch_fn) in PROVIDER_REGISTRY.items():
-            key = self.config.get(cfg_key)
-            if key:
-                results.append(fetch_fn(key))
+        # Auto-detect cookies for providers not saved yet: one browser scan
+        # for all of them, persisted in a single config write.
+        missing = [
+            k for k in sorted(_COOKIE_PROVIDERS)
+            if not self.config.get(k) and k in _COOKIE_DETECT_TARGETS
+        ]
+        detected = _auto_detect_provider_cookies(missing)
+        if detected:
+            self.config.update(detected)
+            _save_config_soon(self.config)
+
+        # Reuse a provider's last good result while it is younger than its
+        # _PROVIDER_MIN_INTERVAL, fetched with the same credentials, and none
+        # of its limits has reset since; reset texts are re-rendered for now.
+        mono, now = time.monotonic(), time.time()
+        fetched = self._provider_fetched
+        slots: list = []   # registry order: ProviderData, or a job to run
+        jobs = []
+        for cfg_key, (_, fetch_fn) in PROVIDER_REGISTRY.items():
+            cred = self.config.get(cfg_key)
+            if not cred:
+                continue
+            prev = fetched.get(cfg_key)
+            reuse = None
+            if (prev is not None and prev[1] == cred and not prev[2].error
+                    and mono - prev[0] < _PROVIDER_MIN_INTERVAL.get(cfg_key, 0)):
+                reuse = _rerender_resets(
+                    prev[2], _PROVIDER_RESET_FMT.get(cfg_key, _fmt_reset), now)
+            if reuse is not None:
+                slots.append(reuse)
+            else:
+                job = (cfg_key, fetch_fn, cred)
+                slots.append(job)
+                jobs.append(job)
+        # fetch_* never raise (errors come back in ProviderData.error)
+        for (cfg_key, _, cred), pd in zip(
+                jobs, _fetch_pool.map(lambda job: job[1](job[2]), jobs)):
+            fetched[cfg_key] = (mono, cred, pd)
+        results = [fetched[slot[0]][2] if isinstance(slot, tuple) else slot
+                   for slot in slots]
         self._provider_data = results
+        self._provider_by_name = {pd.name: pd for pd in results}
+        bar_pcts = {}
+        for pd in results:
+            pct = self._provider_bar_pct(pd)
+            if pct is not None:
+                bar_pcts[pd.name] = pct
+        self._bar_pct_by_name = bar_pcts
 
     # ── callbacks ─────────────────────────────────────────────────────────────
 
+    def _quit(self, sender):
+        # NSApp terminate exits without running Python's atexit hooks
+        _flush_config_save()
+        rumps.quit_application(sender)
+
     def _do_refresh(self, _sender):
+        self._provider_fetched.clear()   # an explicit refresh skips the TTLs
         self._schedule_fetch()
 
     def _open_usage_page(self, _sender):
         subprocess.Popen(["open", "https://claude.ai/settings/usage"])
 
     def _open_history_window(self, _sender):
+        if self._history_reader is None:
+            return
         try:
-            _show_history_window(self._history_db)
+            _show_history_window(self._history_reader)
         except Exception:
             log.exception("Failed to open history window")
 
@@ -3100,18 +4091,12 @@ class ClaudeBar(rumps.App):
     def _make_provider_key_cb(self, cfg_key: str, name: str):
         def _cb(_sender):
             if cfg_key in _COOKIE_PROVIDERS:
-                # Cookie-based: re-run auto-detect
-                _detectors = {
-                    "chatgpt_cookies": _auto_detect_chatgpt_cookies,
-                    "copilot_cookies": _auto_detect_copilot_cookies,
-                    "cursor_cookies":  _auto_detect_cursor_cookies,
-                }
-                detect_fn = _detectors.get(cfg_key)
-                if detect_fn:
-                    ck = detect_fn()
+                # Cookie-based: re-run auto-detect (user asked, so bypass the cache)
+                if cfg_key in _COOKIE_DETECT_TARGETS:
+                    ck = _auto_detect_provider_cookies([cfg_key], force=True).get(cfg_key)
                     if ck:
                         self.config[cfg_key] = ck
-                        save_config(self.config)
+                        _save_config_soon(self.config)
                         _notify("Claude Usage Bar", f"{name} cookies updated ✓", "Fetching usage…")
                         self._schedule_fetch()
                     else:
@@ -3131,14 +4116,15 @@ class ClaudeBar(rumps.App):
                 self.config[cfg_key] = key.strip()
             else:
                 self.config.pop(cfg_key, None)
-            save_config(self.config)
+            _save_config_soon(self.config)
             self._schedule_fetch()
         return _cb
 
     def _make_notif_toggle_cb(self, nkey: str):
         def _cb(sender):
-            current = _notif_enabled(self.config, nkey)
+            current = self._notif_cache[nkey]
             _set_notif(self.config, nkey, not current)
+            self._notif_cache[nkey] = not current
             sender._menuitem.setState_(0 if current else 1)
         return _cb
 
@@ -3146,13 +4132,26 @@ class ClaudeBar(rumps.App):
         def _cb(_sender):
             self._refresh_interval = secs
             self.config["refresh_interval"] = secs
-            save_config(self.config)
+            _save_config_soon(self.config)
             self._timer.stop()
             self._timer = rumps.Timer(self._on_timer, secs)
             self._timer.start()
-            self._rebuild_menu(self._last_data)
+            for item_secs, item in self._interval_items.items():
+                item._menuitem.setState_(1 if item_secs == secs else 0)
         return _cb
 
+    _NOTIF_LABELS = (
+        ("claude_warning",  "Claude — usage warnings (80% / 95%)"),
+        ("claude_reset",    "Claude — reset alerts"),
+        ("claude_pacing",   "Claude — pacing alert (ETA < 30 min)"),
+        ("chatgpt_warning", "ChatGPT — usage warnings (80% / 95%)"),
+        ("chatgpt_reset",   "ChatGPT — reset alerts"),
+        ("chatgpt_pacing",  "ChatGPT — pacing alert (ETA < 30 min)"),
+        ("copilot_pacing",  "Copilot — pacing alert (ETA < 30 min)"),
+        ("cursor_warning",  "Cursor — usage warnings (80% / 95%)"),
+        ("cursor_pacing",   "Cursor — pacing alert (ETA < 30 min)"),
+    )
+
     _TOGGLE_ICONS = {
         "Claude":  ("claude_icon.png",        None),
         "ChatGPT": ("chatgpt_icon_clean.png", "#74AA9C"),
@@ -3231,14 +4230,11 @@ class ClaudeBar(rumps.App):
 
     def _do_bar_toggle(self, name: str):
         """Toggle a provider in the status bar and update views in-place."""
+        prev = tuple(sorted(self.config.get("bar_providers") or ()))
         chosen = self.config.get("bar_providers")
         if not chosen:
             # Switching from auto → manual: seed with current auto selection
-            available_names = {"Claude"} if self._last_data else set()
-            for pd in self._provider_data:
-                if self._provider_bar_pct(pd) is not None:
-                    available_names.add(pd.name)
-            chosen = [n for n in self._BAR_PRIORITY if n in available_names][:2]
+            chosen = list(self._auto_bar_names())
         if name in chosen:
             chosen.remove(name)
         else:
@@ -3248,33 +4244,41 @@ class ClaudeBar(rumps.App):
             self.config.pop("bar_providers", None)
         else:
             self.config["bar_providers"] = chosen
-        save_config(self.config)
+        # e.g. unticking the only auto provider lands back in auto mode
+        if tuple(sorted(self.config.get("bar_providers") or ())) == prev:
+            self._refresh_toggle_checks()
+            return
+        _save_config_soon(self.config)
+        self._refresh_toggle_checks()
+        if self._last_data:
+            self._apply(self._last_data)
 
-        # Update all toggle views in-place (no menu rebuild needed)
+    def _refresh_toggle_checks(self):
+        """Update the Status Bar toggle checkmarks and the Auto item in place
+        (no menu rebuild needed)."""
         effective = self.config.get("bar_providers")
         if not effective:
-            available_names = {"Claude"} if self._last_data else set()
-            for pd in self._provider_data:
-                if self._provider_bar_pct(pd) is not None:
-                    available_names.add(pd.name)
-            auto_shown = set(
-                [n for n in self._BAR_PRIORITY if n in available_names][:2]
-            )
+            auto_shown = self._auto_bar_names()
         else:
             auto_shown = None
 
-        for n, (view, label, check) in self._bar_toggle_views.items():
+        for n, item in self._bar_toggle_items.items():
             is_on = n in effective if effective else n in auto_shown
-            check.setStringValue_("✓" if is_on else "")
-
-        if self._last_data:
-            self._apply(self._last_data)
+            toggle = self._bar_toggle_views.get(n)
+            if toggle is not None:
+                toggle[2].setStringValue_("✓" if is_on else "")
+            else:
+                item._menuitem.setState_(1 if is_on else 0)
+        if self._bar_auto_item is not None:
+            self._bar_auto_item.title = (
+                "Reset to Auto" if effective else "✓ Auto (top 2 active)"
+            )
 
     def _bar_reset_auto(self, _sender):
         """Reset bar display to auto-detect (top 2 active providers)."""
         self.config.pop("bar_providers", None)
-        save_config(self.config)
-        self._rebuild_menu(self._last_data)
+        _save_config_soon(self.config)
+        self._refresh_toggle_checks()
         if self._last_data:
             self._apply(self._last_data)
 
@@ -3293,14 +4297,14 @@ class ClaudeBar(rumps.App):
         )
         if key:
             self.config["cookie_str"] = key.strip()
-            save_config(self.config)
+            _save_config_soon(self.config)
             self._warned_pcts.clear()
             self._auth_fail_count = 0
             self._schedule_fetch()
 
     def _paste_cookie(self, _sender):
         text = _clipboard_text()
-        if not text or ("sessionKey" not in text and "=" not in text):
+        if not text or not _COOKIE_HINT_RE.search(text):
             _notify(
                 "Claude Usage Bar",
                 "Nothing useful in clipboard",
@@ -3308,7 +4312,7 @@ class ClaudeBar(rumps.App):
             )
             return
         self.config["cookie_str"] = text
-        save_config(self.config)
+        _save_config_soon(self.config)
         self._warned_pcts.clear()
         self._auth_fail_count = 0
         self._schedule_fetch()
@@ -3319,16 +4323,24 @@ class ClaudeBar(rumps.App):
         )
 
     def _show_raw(self, _sender):
-        text = json.dumps(self._last_raw.get("usage", self._last_raw), indent=2)
-        _show_text(title="Claude Usage — Raw API Response", text=text)
+        raw = self._last_raw.get("usage", self._last_raw)
+
+        def _dump():
+            # Pretty-printing a large response stays off the main thread;
+            # _show_text itself touches no AppKit state.
+            text = _json_bytes(raw, indent=True).decode()
+            _show_text(title="Claude Usage — Raw API Response", text=text)
+        _io_pool.submit(_dump)
 
     def _toggle_login_item(self, sender):
-        if _is_login_item():
+        if self._login_item_state:
             _remove_login_item()
+            self._login_item_state = False
             sender._menuitem.setState_(0)
             _notify("Claude Usage Bar", "Removed from Login Items", "")
         else:
             _add_login_item()
+            self._login_item_state = True
             sender._menuitem.setState_(1)
             _notify("Claude Usage Bar", "Added to Login Items", "Will launch automatically on login")
 
@@ -3337,7 +4349,7 @@ class ClaudeBar(rumps.App):
         cookie_str = _auto_detect_cookies()
         if cookie_str:
             self.config["cookie_str"] = cookie_str
-            save_config(self.config)
+            _save_config_soon(self.config)
             _notify(
                 "Claude Usage Bar",
                 "Cookies auto-detected from your browser ✓",
@@ -3361,13 +4373,13 @@ class ClaudeBar(rumps.App):
     def _do_auto_detect(self):
         """Background: detect cookies then schedule a fetch."""
         try:
-            cookie_str = _auto_detect_cookies()
+            cookie_str = _auto_detect_cookies(force=True)
         except Exception:
             log.exception("_auto_detect_cookies failed")
             cookie_str = None
         if cookie_str:
             self.config["cookie_str"] = cookie_str
-            save_config(self.config)
+            _save_config_soon(self.config)
             self._warned_pcts.clear()
             self._auth_fail_count = 0
             _notify("Claude Usage Bar", "Cookies auto-detected ✓", "Fetching usage data…")
@@ -3387,13 +4399,11 @@ def _cli_history():
         return
 
     conn = sqlite3.connect(HISTORY_DB)
-    keys = [r[0] for r in conn.execute(
-        "SELECT DISTINCT key FROM daily_stats ORDER BY key"
-    ).fetchall()]
+    weekly = _get_weekly_stats_all(conn)
+    conn.close()
 
-    if not keys:
+    if not weekly:
         print("No history data yet. Run AIQuotaBar for a while first.")
-        conn.close()
         return
 
     # ANSI color map per provider prefix
@@ -3409,11 +4419,10 @@ def _cli_history():
 
     print(f"\n{_bold}  AIQuotaBar — 7-Day Usage History{_reset}\n")
 
-    for key in keys:
-        stats = _get_weekly_stats(conn, key)
-        if not stats:
-            continue
+    bar_width = 30
+    bars = ["█" * i + "░" * (bar_width - i) for i in range(bar_width + 1)]
 
+    for key, stats in weekly.items():
         # Determine color from key prefix
         prefix = key.split("_")[0]
         color = _colors.get(prefix, "")
@@ -3421,15 +4430,12 @@ def _cli_history():
 
         print(f"  {color}{_bold}{label}{_reset}")
 
-        bar_width = 30
         for d in stats:
-            try:
-                day_name = datetime.strptime(d["date"], "%Y-%m-%d").strftime("%a")
-            except Exception:
-                day_name = d["date"][-5:]
+            day_label = _fmt_date_label(d["date"])
+            day_name = day_label[:3] if day_label != d["date"] else d["date"][-5:]
             pct = d["peak_pct"]
-            filled = round(pct / 100 * bar_width)
-            bar = "█" * filled + "░" * (bar_width - filled)
+            filled = (pct * bar_width + 50) // 100
+            bar = bars[min(max(filled, 0), bar_width)]
             hit_mark = " ⚠" if d["limit_hits"] > 0 else ""
             print(f"    {_dim}{day_name}{_reset}  {color}{bar}{_reset}  {pct}%{hit_mark}")
 
@@ -3444,8 +4450,6 @@ def _cli_history():
             summary += f"  ·  hit limit {total_hits}x"
         print(f"  {_dim}{summary}{_reset}\n")
 
-    conn.close()
-
 
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] in ("--history", "-H"):